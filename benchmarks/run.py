@@ -0,0 +1,226 @@
+"""Microbenchmarks for the knowledge base and AI decision paths.
+
+    python -m benchmarks.run --players 3 6 --json results.json
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+    python -m benchmarks.run --deck decks/mansion.toml
+
+Each case is timed per call (setup excluded) and summarised by median and
+mean. With --baseline, any case whose median is slower than the baseline by
+more than --threshold is reported and the exit status is 1.
+
+benchmarks/baseline.json is a reference run; its meta block names the
+machine it came from. Timings only compare on the same machine, so save a
+baseline of your own before measuring a change elsewhere.
+"""
+import argparse
+import copy
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from logic.game_engine import GameEngine
+from logic.knowledge_base import KnowledgeBase
+from logic.planner import SuggestionPlanner
+from logic.simulate import play_game
+from models.cards import REGISTRY, CardRegistry, load_deck
+from models.player import AIPlayer
+
+Case = Tuple[Callable[[], object], Callable[[object], object]]
+
+
+def _mid_game(players: int, turns: int, seed: int,
+              registry: CardRegistry = REGISTRY) -> GameEngine:
+    """An all-AI game played forward `turns` turns (or until it ends)."""
+    engine = GameEngine(human_name=None, ai_count=players, registry=registry,
+                        seed=seed)
+    for _ in range(turns):
+        if engine.game_over:
+            break
+        engine.take_ai_turn(engine.current_player)  # type: ignore[arg-type]
+        if not engine.game_over:
+            engine.next_turn()
+    return engine
+
+
+def _observer(engine: GameEngine) -> AIPlayer:
+    """The first AI still in the game, to benchmark against its knowledge."""
+    return next(p for p in engine.players  # type: ignore[return-value]
+                if isinstance(p, AIPlayer) and p.is_active)
+
+
+def build_cases(players: int, seed: int,
+                registry: CardRegistry = REGISTRY) -> Dict[str, Case]:
+    engine = _mid_game(players, turns=players * 2, seed=seed, registry=registry)
+    ai = _observer(engine)
+    names = [p.name for p in engine.players]
+    other = next(n for n in names if n != ai.name)
+    cards = list(registry.cards)
+    unknown = [c for c in cards
+               if ai.kb.is_known_to_player(other, c) is None] or cards
+    guess = [registry.category_cards(cat)[0] for cat in registry.categories]
+
+    def fresh_kb():
+        return KnowledgeBase(ai.name)
+
+    def kb_copy():
+        return copy.deepcopy(ai.kb)
+
+    def ai_copy():
+        # Decide from scratch: no probe queued and nothing cached, so the
+        # strategy (and planner) does the work being timed
+        a = copy.deepcopy(ai)
+        a.last_unrefuted_suggestion = None
+        a.decisions.clear()
+        a.planner = SuggestionPlanner(a.kb)
+        return a
+
+    return {
+        "kb.initialize": (fresh_kb, lambda kb: kb.initialize(names, cards, ai.hand)),
+        "kb.note_has_card": (kb_copy, lambda kb: kb.note_has_card(other, unknown[0])),
+        "kb.note_cannot_have_any": (kb_copy, lambda kb: kb.note_cannot_have_any(other, guess)),
+        "kb.note_has_one_of": (kb_copy, lambda kb: kb.note_has_one_of(other, guess)),
+        "kb.mark_envelope": (kb_copy, lambda kb: kb.mark_envelope(engine.solution[0])),
+        "kb.update_probabilities": (kb_copy, lambda kb: kb.update_probabilities()),
+        "ai.decide_suggestion": (ai_copy, lambda a: a.decide_suggestion()),
+        "ai.decide_accusation": (ai_copy, lambda a: a.decide_accusation()),
+        "game.full": (lambda: None,
+                      lambda _: play_game(players, seed=seed, registry=registry)),
+    }
+
+
+def _cpu_name() -> str:
+    """The CPU model, from /proc/cpuinfo where there is one."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def time_case(case: Case, reps: int) -> Dict[str, float]:
+    setup, fn = case
+    samples: List[float] = []
+    for _ in range(reps):
+        state = setup()
+        start = time.perf_counter_ns()
+        fn(state)
+        samples.append((time.perf_counter_ns() - start) / 1000.0)
+    return {
+        "median_us": statistics.median(samples),
+        "mean_us": statistics.fmean(samples),
+        "min_us": min(samples),
+        "reps": reps,
+    }
+
+
+def run(players: List[int], reps: int, game_reps: int, seed: int,
+        only: Optional[str] = None, registry: CardRegistry = REGISTRY) -> Dict:
+    results: Dict[str, Dict[str, float]] = {}
+    for n in players:
+        for name, case in build_cases(n, seed, registry).items():
+            if only and only not in name:
+                continue
+            results[f"{name}[p={n}]"] = time_case(
+                case, game_reps if name.startswith("game.") else reps)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu": _cpu_name(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": seed,
+            "deck": registry.name,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Describe every case whose median regressed by more than `threshold`."""
+    regressions = []
+    for name, res in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or base["median_us"] <= 0:
+            continue
+        ratio = res["median_us"] / base["median_us"]
+        if ratio > 1.0 + threshold:
+            regressions.append(
+                f"{name}: {base['median_us']:.1f}us -> {res['median_us']:.1f}us ({ratio:.2f}x)")
+    return regressions
+
+
+def format_table(report: Dict, baseline: Optional[Dict] = None) -> str:
+    lines = [f"{'case':40} {'median us':>12} {'mean us':>12} {'vs base':>8}"]
+    for name, res in report["results"].items():
+        base = (baseline or {}).get("results", {}).get(name)
+        ratio = f"{res['median_us'] / base['median_us']:.2f}x" if base else ""
+        lines.append(
+            f"{name:40} {res['median_us']:12.1f} {res['mean_us']:12.1f} {ratio:>8}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, nargs="+", default=[3, 6],
+                        help="AI player counts to benchmark")
+    parser.add_argument("--reps", type=int, default=200,
+                        help="timed calls per case")
+    parser.add_argument("--game-reps", type=int, default=20,
+                        help="timed calls for full-game cases")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--only", help="run only cases whose name contains this")
+    parser.add_argument("--json", metavar="PATH",
+                        help="write results as JSON ('-' for stdout)")
+    parser.add_argument("--baseline", metavar="PATH",
+                        help="compare against a stored JSON result")
+    parser.add_argument("--save-baseline", metavar="PATH",
+                        help="store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed median slowdown before flagging (0.25 = 25%%)")
+    parser.add_argument("--deck", metavar="PATH",
+                        help="benchmark with the deck defined in this .json/.toml file")
+    args = parser.parse_args(argv)
+
+    registry = load_deck(args.deck) if args.deck else REGISTRY
+    report = run(args.players, args.reps, args.game_reps, args.seed, args.only,
+                 registry)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    if args.json == "-":
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_table(report, baseline))
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if baseline:
+        base_cpu = baseline.get("meta", {}).get("cpu")
+        if base_cpu != report["meta"]["cpu"]:
+            print(f"note: baseline was recorded on {base_cpu or 'an unknown CPU'}, "
+                  f"not {report['meta']['cpu'] or 'this one'}", file=sys.stderr)
+        regressions = compare(report, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
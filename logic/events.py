@@ -0,0 +1,52 @@
+"""Publish/subscribe hub for things that happen in a game.
+
+GameEngine publishes a GameEvent for each change a frontend may want to
+show; subscribers are called synchronously, on whatever thread is driving
+the engine, in subscription order.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Literal, Mapping, Tuple, get_args
+
+EventKind = Literal["suggestion_made", "card_shown", "player_eliminated",
+                    "turn_advanced", "log_appended", "game_over"]
+
+# Every kind, for subscribing to all of them
+EVENT_KINDS: Tuple[EventKind, ...] = get_args(EventKind)
+
+
+@dataclass(frozen=True)
+class GameEvent:
+    """One published event.
+
+    suggestion_made: suggester, cards; card_shown: suggester, shower, card
+    (None unless the suggester is human); player_eliminated: player;
+    turn_advanced: player, turn; log_appended: entry; game_over: winner.
+    """
+    kind: EventKind
+    data: Mapping[str, Any] = field(default_factory=dict)
+
+
+Handler = Callable[[GameEvent], None]
+
+
+class EventBus:
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = {}
+
+    def subscribe(self, kind: EventKind, handler: Handler) -> Callable[[], None]:
+        """Call handler for every event of this kind; returns an unsubscribe function."""
+        handlers = self._handlers.setdefault(kind, [])
+        handlers.append(handler)
+
+        def unsubscribe() -> None:
+            if handler in handlers:
+                handlers.remove(handler)
+        return unsubscribe
+
+    def publish(self, kind: EventKind, **data: Any) -> None:
+        handlers = self._handlers.get(kind)
+        if not handlers:
+            return
+        event = GameEvent(kind, data)
+        for handler in handlers[:]:
+            handler(event)
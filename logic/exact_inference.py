@@ -0,0 +1,211 @@
+"""Exact card-location probabilities by counting consistent deals.
+
+A deal puts every card in one *slot*: a player's hand, or the envelope's
+single slot for the card's category. Cards that allow the same set of slots
+and belong to the same "has one of" clauses are interchangeable, so deals
+are counted per group of such cards with a memoized DP over
+(remaining capacity per slot, clauses satisfied so far), weighting each way
+of splitting a group across slots by its multinomial coefficient.
+"""
+from functools import lru_cache
+from math import comb
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Upper bound on counting work (memoized DP states plus transitions tried)
+# before giving up on an exact answer; about a second at most
+DEFAULT_MAX_WORK = 100_000
+
+# Split lists up to this long are cached across calls; longer ones (large
+# groups) are generated afresh so the cache stays small
+MAX_CACHED_SPLITS = 1000
+
+Marginals = Tuple[Tuple[float, ...], ...]
+
+
+class TooComplex(Exception):
+    """Raised internally when counting would exceed the work budget."""
+
+
+def _splits(size: int, caps: Tuple[int, ...]) -> Iterator[Tuple[Tuple[int, ...], int]]:
+    """Every way to spread `size` interchangeable cards over slots with these
+    capacities, each with its multinomial weight."""
+    if len(caps) == 1:
+        if size <= caps[0]:
+            yield (size,), 1
+        return
+    # Leave no more cards than the later slots can take
+    room = sum(caps[1:])
+    for k in range(min(size, caps[0]), max(0, size - room) - 1, -1):
+        for rest, weight in _splits(size - k, caps[1:]):
+            yield (k,) + rest, weight * comb(size, k)
+
+
+@lru_cache(maxsize=4096)
+def _cached_splits(size: int, caps: Tuple[int, ...]) -> Tuple[Tuple[Tuple[int, ...], int], ...]:
+    return tuple(_splits(size, caps))
+
+
+def _split_count(size: int, caps: Tuple[int, ...]) -> int:
+    """How many items _splits(size, caps) yields, without listing them."""
+    ways = [1] + [0] * size  # ways[t]: splits of t cards over the slots so far
+    for cap in caps:
+        ways = [sum(ways[t - k] for k in range(min(t, cap) + 1))
+                for t in range(size + 1)]
+    return ways[size]
+
+
+@lru_cache(maxsize=512)
+def card_marginals(allowed: Tuple[int, ...], capacities: Tuple[int, ...],
+                   clauses: Tuple[Tuple[int, int], ...] = (),
+                   max_work: int = DEFAULT_MAX_WORK) -> Optional[Marginals]:
+    """Probability of each card sitting in each slot, over all consistent deals.
+
+    allowed[c] is a bitmask of the slots card c may be in (0 = card not in
+    play), capacities[s] is how many cards slot s holds, and each clause
+    (slot, card_mask) says that slot holds at least one of those cards.
+    Returns marginals[c][s], or None when no deal is consistent or counting
+    would take more than `max_work` DP states plus transitions. Results are
+    cached on the arguments.
+    """
+    n_slots = len(capacities)
+    caps = list(capacities)
+    satisfied = 0  # clauses already met by cards with a single possible slot
+    fixed: Dict[int, int] = {}
+    members: Dict[Tuple[int, int], List[int]] = {}
+
+    for c, mask in enumerate(allowed):
+        if not mask:
+            continue
+        in_clauses = 0
+        for j, (slot, cards) in enumerate(clauses):
+            if cards >> c & 1 and mask >> slot & 1:
+                in_clauses |= 1 << j
+        if mask & (mask - 1) == 0:
+            # Only one place this card can be
+            slot = mask.bit_length() - 1
+            fixed[c] = slot
+            caps[slot] -= 1
+            if caps[slot] < 0:
+                return None
+            for j, (s, _) in enumerate(clauses):
+                if in_clauses >> j & 1 and s == slot:
+                    satisfied |= 1 << j
+        else:
+            members.setdefault((mask, in_clauses), []).append(c)
+
+    # Only clauses not already satisfied by fixed cards are tracked in the DP
+    open_clauses = [j for j in range(len(clauses)) if not satisfied >> j & 1]
+    renumber = {j: k for k, j in enumerate(open_clauses)}
+    # Groups touching clauses go first so clause bits settle early and states merge
+    groups = sorted(members.items(), key=lambda g: (g[0][1] == 0, g[0][1]))
+    group_slots = [[s for s in range(n_slots) if mask >> s & 1]
+                   for (mask, _), _ in groups]
+    # For each group: slot -> open clauses satisfied by putting any of its cards there
+    group_sat = []
+    last_group: Dict[int, int] = {}
+    for i, ((mask, in_clauses), _) in enumerate(groups):
+        by_slot = [0] * n_slots
+        for j, (slot, _) in enumerate(clauses):
+            if in_clauses >> j & 1 and j in renumber:
+                by_slot[slot] |= 1 << renumber[j]
+                last_group[renumber[j]] = i
+        group_sat.append(by_slot)
+    if len(last_group) < len(open_clauses):
+        return None  # some clause can no longer be satisfied
+    # Clauses whose last chance is group i must be satisfied once it is placed
+    settles = [0] * len(groups)
+    for k, i in last_group.items():
+        settles[i] |= 1 << k
+    sizes = [len(cards) for _, cards in groups]
+    suffix = [0] * (len(groups) + 1)
+    for i in range(len(groups) - 1, -1, -1):
+        suffix[i] = suffix[i + 1] + sizes[i]
+    # Capacities only shrink, so these bound each group's splits in any state
+    split_counts = [_split_count(sizes[i], tuple(caps[s] for s in group_slots[i]))
+                    for i in range(len(groups))]
+    if any(n > max_work for n in split_counts):
+        return None  # a group too big to split across its slots even once
+    # States of one layer differ in the capacity left per shared slot, and
+    # the total is fixed, so the largest slot follows from the others
+    shared = sorted(caps[s] for s in range(n_slots)
+                    if any(s in slots for slots in group_slots))
+    width = 1
+    for cap in shared[:-1]:
+        width *= cap + 1
+    if width > max_work:
+        return None
+
+    def transitions(i: int, caps: Tuple[int, ...], sat: int):
+        slots, by_slot, settled = group_slots[i], group_sat[i], settles[i]
+        split = _cached_splits if split_counts[i] <= MAX_CACHED_SPLITS else _splits
+        for counts, weight in split(sizes[i], tuple(caps[s] for s in slots)):
+            new_caps = list(caps)
+            new_sat = sat
+            for s, k in zip(slots, counts):
+                if k:
+                    new_caps[s] -= k
+                    new_sat |= by_slot[s]
+            if new_sat & settled != settled:
+                continue
+            yield tuple(new_caps), new_sat & ~settled, weight, counts
+
+    memo: Dict[Tuple[int, Tuple[int, ...], int], int] = {}
+    # Work left: each new state and each transition tried costs one
+    budget = max_work
+
+    def count(i: int, caps: Tuple[int, ...], sat: int) -> int:
+        nonlocal budget
+        if i == len(groups):
+            return 0 if any(caps) else 1
+        if sum(caps) != suffix[i]:
+            return 0
+        key = (i, caps, sat)
+        if key in memo:
+            return memo[key]
+        total = 0
+        for new_caps, new_sat, weight, _ in transitions(i, caps, sat):
+            budget -= 1
+            if budget < 0:
+                raise TooComplex
+            sub = count(i + 1, new_caps, new_sat)
+            if sub:
+                total += weight * sub
+        memo[key] = total
+        budget -= 1
+        return total
+
+    start = tuple(caps)
+    try:
+        total = count(0, start, 0)
+    except TooComplex:
+        return None
+    if not total:
+        return None
+
+    # Forward pass: flow into each DP state times the completions out of it
+    expected = [[0] * n_slots for _ in groups]
+    layer = {(start, 0): 1}
+    for i in range(len(groups)):
+        nxt: Dict[Tuple[Tuple[int, ...], int], int] = {}
+        for (caps_i, sat), flow_in in layer.items():
+            for new_caps, new_sat, weight, counts in transitions(i, caps_i, sat):
+                sub = count(i + 1, new_caps, new_sat)
+                if not sub:
+                    continue
+                flow = flow_in * weight
+                nxt[(new_caps, new_sat)] = nxt.get(
+                    (new_caps, new_sat), 0) + flow
+                for s, k in zip(group_slots[i], counts):
+                    if k:
+                        expected[i][s] += flow * sub * k
+        layer = nxt
+
+    result: List[Tuple[float, ...]] = [(0.0,) * n_slots] * len(allowed)
+    for c, slot in fixed.items():
+        result[c] = tuple(1.0 if s == slot else 0.0 for s in range(n_slots))
+    for i, (_, cards) in enumerate(groups):
+        denom = total * sizes[i]
+        row = tuple(e / denom for e in expected[i])
+        for c in cards:
+            result[c] = row
+    return tuple(result)
@@ -1,55 +1,127 @@
 import random
-from typing import List, Tuple, Optional, Dict
-from dataclasses import dataclass, field
-from models.cards import Card, all_cards, category_cards, card_key
-from models.player import Player, AIPlayer
+import threading
+from typing import (Awaitable, Callable, Dict, Generator, List, Optional, Protocol,
+                    Sequence, TextIO, Tuple)
+from dataclasses import dataclass, field, replace
+from models.cards import REGISTRY, Card, CardRegistry, describe_guess
+from models.player import Player, AIPlayer, SuggestionOutcome
 from logic.knowledge_base import ENVELOPE
-from typing import TYPE_CHECKING
+from logic.game_log import GameLog, LogEntry, LogEvent
+from logic.events import EventBus
+from logic.seeding import make_rng, new_seed
+from logic.strategies import DEFAULT_STRATEGY, get_strategy
 
-if TYPE_CHECKING:
-    from ui.app import ClueApp  # type hint only
 
+@dataclass(frozen=True)
+class ShowCardRequest:
+    """A suspended suggestion waiting for a human to pick the card to show."""
+    # The human who must show a card, and who is asking
+    responder: str
+    suggester: str
+    # The responder's cards among those suggested; the answer must be one of
+    # them (anything else, None included, makes the flow raise ValueError)
+    cards: Tuple[Card, ...]
 
-@dataclass
-class LogEntry:
-    text: str
+
+# A resumable engine operation: yields requests, is resumed with send(card)
+# and returns its result (see GameEngine.suggestion_flow)
+Flow = Generator[ShowCardRequest, Optional[Card], object]
+# Asynchronously answers a request with the card to show
+AskCard = Callable[[ShowCardRequest], Awaitable[Card]]
+
+
+class HumanResponder(Protocol):
+    """Asks the human player which card to show; frontends implement this.
+
+    Called on whatever thread is driving the engine, with the engine lock held.
+    Must return one of cards: a player holding a suggested card cannot pass.
+    """
+
+    def choose_card_to_show(self, cards: List[Card], suggester: str) -> Card:
+        ...
 
 
 @dataclass
 class GameEngine:
-    human_name: str = "You"
+    # None seats no human, for all-AI (headless) games
+    human_name: Optional[str] = "You"
     ai_count: int = 2
+    # AI players derive probabilities by exact deal counting
+    exact_inference: bool = False
+    # Strategy name for each AI seat, in seat order (default: all "planner")
+    ai_strategies: Optional[Sequence[str]] = None
+    # The deck: its categories, and the cards in each (see models.cards.load_deck)
+    registry: CardRegistry = REGISTRY
     players: List[Player] = field(default_factory=list)
-    solution: Tuple[Card, Card, Card] = None  # type: ignore
+    # One card per deck category, in registry.categories order
+    solution: Tuple[Card, ...] = None  # type: ignore
     deck: List[Card] = field(default_factory=list)
     turn_index: int = 0
-    logs: List[LogEntry] = field(default_factory=list)
+    logs: GameLog = field(default_factory=GameLog)
+    # Optional file every log entry is also written to, as JSON lines
+    log_sink: Optional[TextIO] = None
+    # Turns completed so far (turn_index is only the seat)
+    turn_count: int = 0
+    # False leaves players, hands and solution empty, for filling in from a
+    # saved game (see logic.snapshot)
+    auto_setup: bool = True
+    # Base seed for all of this game's randomness (dealing and every player);
+    # None draws one from the global random state. The same seed replays the
+    # same game.
+    seed: Optional[int] = None
 
     # NEW
     suggested_this_turn: bool = False
     game_over: bool = False
     winner: Optional[str] = None
+    # Held by whoever is driving the game (UI thread or AI worker) while they
+    # read or change engine state
+    lock: threading.RLock = field(default_factory=threading.RLock,
+                                  repr=False, compare=False)
+    # Frontends subscribe here instead of polling engine state
+    events: EventBus = field(default_factory=EventBus, repr=False, compare=False)
+    # Chooses the card a human shows; None lets the human's Player choose
+    # automatically, as headless runs do
+    human_responder: Optional[HumanResponder] = field(default=None, repr=False,
+                                                      compare=False)
+    # The request a suspended suggestion flow is waiting on, if any
+    pending_request: Optional[ShowCardRequest] = field(default=None, init=False,
+                                                       repr=False, compare=False)
+    rng: random.Random = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
-        self._setup_game()
+        if self.seed is None:
+            self.seed = new_seed()
+        self.rng = make_rng(self.seed, "engine")
+        if self.log_sink is not None:
+            self.logs.sink = self.log_sink
+        if self.auto_setup:
+            self._setup_game()
 
     def _setup_game(self) -> None:
         # Create players
-        self.players = [Player(self.human_name, True)] + \
-            [AIPlayer(f"AI {i+1}") for i in range(self.ai_count)]
-        for p in self.players:
+        humans = [Player(self.human_name, True)
+                  ] if self.human_name is not None else []
+        strategies = [DEFAULT_STRATEGY] * self.ai_count
+        if self.ai_strategies is not None:
+            if len(self.ai_strategies) != self.ai_count:
+                raise ValueError(
+                    f"{len(self.ai_strategies)} strategies for {self.ai_count} AI players")
+            strategies = [get_strategy(name) for name in self.ai_strategies]
+        self.players = humans + \
+            [AIPlayer(f"AI {i+1}", exact=self.exact_inference, strategy=strategy)
+             for i, strategy in enumerate(strategies)]
+        for i, p in enumerate(self.players):
             p.is_active = True
+            p.rng = make_rng(self.seed, "player", i)
 
         # Build solution and deal
-        suspects = category_cards("Suspect")
-        weapons = category_cards("Weapon")
-        rooms = category_cards("Room")
-        sol = (random.choice(suspects), random.choice(
-            weapons), random.choice(rooms))
+        sol = tuple(self.rng.choice(self.registry.category_cards(cat))
+                    for cat in self.registry.categories)
         self.solution = sol
 
-        deck = [c for c in all_cards() if c not in sol]
-        random.shuffle(deck)
+        deck = [c for c in self.registry.cards if c not in sol]
+        self.rng.shuffle(deck)
         self.deck = deck
 
         # Deal cards round-robin
@@ -60,27 +132,31 @@ class GameEngine:
 
         # Initialize AI knowledge bases
         names = [p.name for p in self.players]
+        hand_sizes = {p.name: len(p.hand) for p in self.players}
         for p in self.players:
             if isinstance(p, AIPlayer):
-                p.on_dealt(names, all_cards())
+                p.on_dealt(names, list(self.registry.cards), hand_sizes)
 
-        self.log(f"Game started with players: {', '.join(names)}.")
+        self.log(f"Game started with players: {', '.join(names)}.",
+                 event="game_start")
         self._ensure_turn_on_active()
         self.suggested_this_turn = False
 
     def _active_players(self) -> List[Player]:
         return [p for p in self.players if getattr(p, "is_active", True)]
 
-    def set_ui(self, ui: "ClueApp"):
-        """Attach the UI to allow human interaction during events like showing a card."""
-        self.ui = ui
+    def set_responder(self, responder: Optional[HumanResponder]) -> None:
+        """Route the human's card-showing choices to responder (e.g. the UI)."""
+        self.human_responder = responder
 
     def _maybe_end_if_single_remaining(self) -> None:
         actives = self._active_players()
         if len(actives) == 1 and not self.game_over:
             self.game_over = True
             self.winner = actives[0].name
-            self.log(f"{self.winner} wins by being the last active player.")
+            self.log(f"{self.winner} wins by being the last active player.",
+                     self.winner, "win")
+            self.events.publish("game_over", winner=self.winner)
 
     def _ensure_turn_on_active(self) -> None:
         if not self.players:
@@ -103,14 +179,18 @@ class GameEngine:
             self.turn_index = (self.turn_index + 1) % len(self.players)
             if self.players[self.turn_index].is_active:
                 break
+        self.turn_count += 1
         self.suggested_this_turn = False
         self._maybe_end_if_single_remaining()
+        if not self.game_over:
+            self.events.publish("turn_advanced", player=self.current_player.name,
+                                turn=self.turn_count)
 
-    def log(self, msg: str) -> None:
-        self.logs.append(LogEntry(msg))
-        # Trim to avoid runaway growth
-        if len(self.logs) > 500:
-            self.logs = self.logs[-500:]
+    def log(self, msg: str, actor: Optional[str] = None,
+            event: LogEvent = "info") -> LogEntry:
+        entry = self.logs.append(msg, self.turn_count, actor, event)
+        self.events.publish("log_appended", entry=entry)
+        return entry
 
     def player_order_after(self, player: Player) -> List[Player]:
         idx = self.players.index(player)
@@ -119,128 +199,213 @@ class GameEngine:
             order.append(self.players[(idx + k) % len(self.players)])
         return order
 
-    def handle_suggestion(self, suggester: Player, suspect: Card, weapon: Card, room: Card) -> Dict[str, Optional[Card]]:
+    def _check_guess(self, cards: Tuple[Card, ...]) -> None:
+        if tuple(c.type for c in cards) != self.registry.categories:
+            raise ValueError(
+                f"expected one card each of {', '.join(self.registry.categories)}")
+
+    def suggestion_flow(self, suggester: Player, *cards: Card) -> Flow:
+        """The suggestion as a resumable flow.
+
+        Runs until a human must pick the card to show, then yields a
+        ShowCardRequest; resume it with send(card). Its return value (the
+        StopIteration value) is handle_suggestion's result. While it is
+        suspended, pending_request holds the open request.
+        """
+        self._check_guess(cards)
         result: Dict[str, Optional[Card]] = {"shower": None, "card": None}
 
         # block multiple suggestions in the same turn
         if self.game_over:
-            self.log("Game is over. No further suggestions.")
+            self.log("Game is over. No further suggestions.",
+                     suggester.name, "rejected")
+            return result
+        if self.pending_request is not None:
+            self.log(f"Waiting for {self.pending_request.responder} to show a card.",
+                     suggester.name, "rejected")
             return result
         if suggester != self.current_player:
-            self.log(f"It is not {suggester.name}'s turn.")
+            self.log(f"It is not {suggester.name}'s turn.",
+                     suggester.name, "rejected")
             return result
         if self.suggested_this_turn:
-            self.log(f"{suggester.name} already made a suggestion this turn.")
+            self.log(
+                f"{suggester.name} already made a suggestion this turn.",
+                suggester.name, "rejected")
             return result
 
-        suggested = [suspect, weapon, room]
-        self.log(
-            f"{suggester.name} suggests: {suspect.name} with the {weapon.name} in the {room.name}.")
+        suggested = list(cards)
+        self.log(f"{suggester.name} suggests: {describe_guess(cards)}.",
+                 suggester.name, "suggestion")
+        self.events.publish("suggestion_made", suggester=suggester.name,
+                            cards=cards)
 
         passes_before_refute: List[str] = []
-        result = {"shower": None, "card": None}  # type: ignore
 
         for responder in self.player_order_after(suggester):
             if responder.has_any(suggested):
+                offered = tuple(c for c in suggested if c in responder.hand)
                 if responder.is_human:
-                    # Human chooses a card to show
-                    from ui.show_card_dialog import ShowCardDialog
-                    dialog = ShowCardDialog(self.ui.winfo_toplevel(), [
-                                            c for c in suggested if c in responder.hand])
-                    chosen_name = dialog.result
-                    shown = None
-                    if chosen_name:
-                        shown = next(
-                            c for c in responder.hand if c.name == chosen_name)
+                    # Wait for the human's choice, however long it takes
+                    request = ShowCardRequest(responder.name, suggester.name, offered)
+                    self.pending_request = request
+                    try:
+                        shown = yield request
+                    finally:
+                        self.pending_request = None
                 else:
                     shown = responder.choose_card_to_show(
                         suggested, self.current_player.name)
-
+                # A player holding a suggested card must show one; anything
+                # else would tell every AI they hold none of them
                 if shown is None:
-                    # Should not happen given has_any
-                    passes_before_refute.append(responder.name)
-                    continue
+                    raise ValueError(f"{responder.name} must show one of "
+                                     f"{', '.join(c.name for c in offered)}")
+                if shown not in offered:
+                    raise ValueError(f"{responder.name} cannot show {shown.name}")
 
                 # Notify knowledge bases
-                if isinstance(suggester, AIPlayer):
-                    suggester.note_refute_seen(responder.name, shown)
-                    for passer in passes_before_refute:
-                        suggester.note_pass(passer, suggested)
-                else:
-                    # Human saw the card; AI only knows someone refuted
-                    for p in self.players:
-                        if isinstance(p, AIPlayer) and p.name != responder.name:
-                            p.note_has_one_of(responder.name, suggested)
-                        if isinstance(p, AIPlayer):
-                            for passer in passes_before_refute:
-                                p.note_pass(passer, suggested)
-
-                self.log(f"{responder.name} shows a card to {suggester.name}.")
+                self._broadcast(SuggestionOutcome(
+                    suggester.name, cards,
+                    tuple(passes_before_refute), responder.name, shown))
+
+                self.log(f"{responder.name} shows a card to {suggester.name}.",
+                         responder.name, "card_shown")
                 result["shower"] = responder.name
                 result["card"] = shown if suggester.is_human else None
+                self.events.publish("card_shown", suggester=suggester.name,
+                                    shower=responder.name, card=result["card"])
                 self.suggested_this_turn = True
                 return result
             else:
                 passes_before_refute.append(responder.name)
 
         # No one could refute; update KBs
-        self.log("No one could refute the suggestion.")
-        if isinstance(suggester, AIPlayer):
-            for passer in passes_before_refute:
-                suggester.note_pass(passer, suggested)
-            # Suggester can conclude envelope for any of the suggested cards they don't hold
-            suggester.note_no_one_refuted(suggested, suggester.name)
-
-        # Observers also learn all passes; some may be able to conclude envelope too
-        for p in self.players:
-            if isinstance(p, AIPlayer):
-                for passer in passes_before_refute:
-                    p.note_pass(passer, suggested)
-                p.note_no_one_refuted(suggested, suggester.name)
-                p.try_infer_envelope_after_no_refute(suggester.name, suggested)
+        self.log("No one could refute the suggestion.",
+                 suggester.name, "no_refute")
+        self._broadcast(SuggestionOutcome(
+            suggester.name, cards, tuple(passes_before_refute)))
 
         self.suggested_this_turn = True
         return result
 
-    def check_accusation(self, accuser: Player, suspect: Card, weapon: Card, room: Card) -> bool:
+    def handle_suggestion(self, suggester: Player, *cards: Card) -> Dict[str, Optional[Card]]:
+        """Suggest one card per category, in registry.categories order.
+
+        Blocks while human_responder picks any card a human shows.
+        """
+        return self._run(self.suggestion_flow(suggester, *cards))
+
+    async def handle_suggestion_async(self, suggester: Player, *cards: Card,
+                                      ask: AskCard) -> Dict[str, Optional[Card]]:
+        """handle_suggestion for asyncio hosts: a human's card comes from
+        awaiting ask(request), so other games run meanwhile. Do not hold
+        engine.lock across the call."""
+        return await self._run_async(self.suggestion_flow(suggester, *cards), ask)
+
+    def _answer(self, request: ShowCardRequest) -> Optional[Card]:
+        """A human's card chosen synchronously: by human_responder if set,
+        otherwise automatically by their Player."""
+        if self.human_responder is not None:
+            return self.human_responder.choose_card_to_show(
+                list(request.cards), request.suggester)
+        player = next(p for p in self.players if p.name == request.responder)
+        return player.choose_card_to_show(list(request.cards), request.suggester)
+
+    def _run(self, flow: Flow):
+        """Drive a flow to completion, answering its requests with _answer."""
+        try:
+            request = next(flow)
+            while True:
+                request = flow.send(self._answer(request))
+        except StopIteration as done:
+            return done.value
+        finally:
+            # If answering raised, don't leave the engine suspended mid-suggestion
+            flow.close()
+
+    @staticmethod
+    async def _run_async(flow: Flow, ask: AskCard):
+        try:
+            request = next(flow)
+            while True:
+                request = flow.send(await ask(request))
+        except StopIteration as done:
+            return done.value
+        finally:
+            # Also covers ask() raising or the task being cancelled
+            flow.close()
+
+    def _broadcast(self, outcome: SuggestionOutcome) -> None:
+        """Let every AI observe a suggestion; only the suggester sees the shown card."""
+        for p in self.players:
+            if isinstance(p, AIPlayer):
+                p.observe_suggestion(outcome if p.name == outcome.suggester
+                                     else replace(outcome, shown=None))
+
+    def check_accusation(self, accuser: Player, *cards: Card) -> bool:
+        """Accuse one card per category, in registry.categories order."""
+        self._check_guess(cards)
         if self.game_over:
             return False
-        correct = (suspect, weapon, room) == self.solution
+        correct = cards == self.solution
         if correct:
             self.log(
-                f"{accuser.name} accuses correctly! {suspect.name} with the {weapon.name} in the {room.name}.")
+                f"{accuser.name} accuses correctly! {describe_guess(cards)}.",
+                accuser.name, "win")
             self.game_over = True
             self.winner = accuser.name
+            self.events.publish("game_over", winner=self.winner)
         else:
             self.log(
-                f"{accuser.name} accuses incorrectly and is out of the game.")
+                f"{accuser.name} accuses incorrectly and is out of the game.",
+                accuser.name, "eliminated")
             accuser.is_active = False
+            self.events.publish("player_eliminated", player=accuser.name)
             self._maybe_end_if_single_remaining()
         return correct
 
     # --- AI turn helpers ---
 
-    def take_ai_turn(self, ai: AIPlayer):
-        """Runs an AI turn: attempt accusation, else suggest, then re-check accusation."""
-
-        # First attempt: accuse right away if confident
-        accusation = ai.decide_accusation()
-        if accusation:
-            s, w, r = accusation
-            self.log(
-                f"{ai.name} decides to accuse right away: {s.name} with the {w.name} in the {r.name}")
-            self.check_accusation(ai, s, w, r)
+    def ai_turn_flow(self, ai: AIPlayer) -> Flow:
+        """An AI turn as a resumable flow: attempt accusation, else suggest,
+        then re-check accusation. Yields a ShowCardRequest whenever a human
+        must show the AI a card (see suggestion_flow)."""
+        if self._ai_opening_accusation(ai):
             return
+        yield from self.suggestion_flow(ai, *ai.decide_suggestion())
+        self._ai_follow_up_accusation(ai)
 
-        # Make a suggestion
-        s, w, r = ai.decide_suggestion()
-        self.handle_suggestion(ai, s, w, r)
+    def _ai_opening_accusation(self, ai: AIPlayer) -> bool:
+        """Accuse right away if confident; True if the AI accused."""
+        accusation = ai.decide_accusation()
+        if not accusation:
+            return False
+        self.log(
+            f"{ai.name} decides to accuse right away: {describe_guess(accusation)}",
+            ai.name, "accusation")
+        self.check_accusation(ai, *accusation)
+        return True
 
-        # Second chance: new info might push them to accuse
+    def _ai_follow_up_accusation(self, ai: AIPlayer) -> None:
+        """Second chance: new info might push the AI to accuse."""
         if not self.game_over and ai.is_active:
             accusation = ai.decide_accusation()
             if accusation:
-                s, w, r = accusation
                 self.log(
-                    f"{ai.name} makes a follow-up accusation after suggestion: {s.name} with the {w.name} in the {r.name}")
-                self.check_accusation(ai, s, w, r)
+                    f"{ai.name} makes a follow-up accusation after suggestion: {describe_guess(accusation)}",
+                    ai.name, "accusation")
+                self.check_accusation(ai, *accusation)
+
+    def take_ai_turn(self, ai: AIPlayer):
+        """Runs an AI turn, blocking while human_responder picks any card a human shows."""
+        # Same steps as ai_turn_flow, but through handle_suggestion so the
+        # blocking path shares (and is profiled as) one suggestion entry point
+        if self._ai_opening_accusation(ai):
+            return
+        self.handle_suggestion(ai, *ai.decide_suggestion())
+        self._ai_follow_up_accusation(ai)
+
+    async def take_ai_turn_async(self, ai: AIPlayer, ask: AskCard) -> None:
+        """take_ai_turn for asyncio hosts; see handle_suggestion_async."""
+        await self._run_async(self.ai_turn_flow(ai), ask)
@@ -0,0 +1,83 @@
+"""Bounded, structured game log.
+
+Entries carry a sequence number that keeps counting after old entries fall
+out of the buffer, so readers can ask for everything newer than the last
+entry they saw. An optional sink receives every entry as a JSON line.
+"""
+import json
+from collections import deque
+from typing import Deque, Dict, Iterable, Iterator, List, Literal, Optional, TextIO
+
+LogEvent = Literal["info", "game_start", "suggestion", "card_shown",
+                   "no_refute", "accusation", "eliminated", "win", "rejected"]
+
+
+class LogEntry:
+    __slots__ = ("seq", "turn", "actor", "event", "text")
+
+    def __init__(self, seq: int, turn: int, actor: Optional[str],
+                 event: LogEvent, text: str):
+        self.seq = seq
+        self.turn = turn
+        self.actor = actor
+        self.event = event
+        self.text = text
+
+    def to_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return (f"LogEntry(seq={self.seq}, turn={self.turn}, actor={self.actor!r}, "
+                f"event={self.event!r}, text={self.text!r})")
+
+
+class GameLog:
+    """Ring buffer of the most recent `maxlen` entries."""
+
+    def __init__(self, maxlen: int = 500, sink: Optional[TextIO] = None):
+        self._entries: Deque[LogEntry] = deque(maxlen=maxlen)
+        # Sequence number of the newest entry (0 before the first)
+        self.last_seq = 0
+        # Receives one JSON object per line for every entry; the caller owns it
+        self.sink = sink
+
+    def append(self, text: str, turn: int, actor: Optional[str],
+               event: LogEvent) -> LogEntry:
+        self.last_seq += 1
+        entry = LogEntry(self.last_seq, turn, actor, event, text)
+        self._entries.append(entry)
+        if self.sink is not None:
+            self.sink.write(json.dumps(entry.to_dict()) + "\n")
+        return entry
+
+    @property
+    def maxlen(self) -> int:
+        return self._entries.maxlen  # type: ignore[return-value]
+
+    def restore(self, entries: Iterable[LogEntry], last_seq: int) -> None:
+        """Replace the buffer with saved entries (nothing goes to the sink)."""
+        self._entries.clear()
+        self._entries.extend(entries)
+        self.last_seq = last_seq
+
+    def entries_since(self, seq: int) -> List[LogEntry]:
+        """Buffered entries newer than `seq`, oldest first."""
+        wanted = min(self.last_seq - seq, len(self._entries))
+        if wanted <= 0:
+            return []
+        out = []
+        for entry in reversed(self._entries):
+            out.append(entry)
+            if len(out) == wanted:
+                break
+        out.reverse()
+        return out
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[LogEntry]:
+        return iter(self._entries)
+
+    def __getitem__(self, index: int) -> LogEntry:
+        return self._entries[index]
@@ -1,230 +1,831 @@
-from typing import Dict, List, Optional, Tuple
-from models.cards import Card, CardType, category_cards, card_key
+import random
+from array import array
+from collections.abc import MutableMapping
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Literal, Optional, Tuple
+from logic.exact_inference import card_marginals
+from models.cards import Card, CardType, card_id, card_key
 
 ENVELOPE = "ENVELOPE"
 
+FactKind = Literal["has", "cannot_have_any", "has_one_of", "envelope"]
+
+
+@dataclass(frozen=True)
+class Fact:
+    """One observation for KnowledgeBase.apply_events.
+
+    has: holder has cards[0]; cannot_have_any: holder has none of cards;
+    has_one_of: holder has at least one of cards; envelope: cards[0] is in
+    the envelope (holder is ignored).
+    """
+    kind: FactKind
+    holder: str
+    cards: Tuple[Card, ...]
+
+
+# Fingerprint arithmetic is modulo 2**64
+_MASK64 = (1 << 64) - 1
+# Zobrist key tables, one block per (kind, holder): card certainly held, certainly
+# not held, a soft-evidence bump (clause bias for players, nudge for the envelope),
+# and card shown at least once (holder 0's block only)
+_HAS, _HAS_NOT, _SOFT, _REFUTED = range(4)
+
+
+@lru_cache(maxsize=None)
+def _zobrist_keys(count: int) -> Tuple[int, ...]:
+    # Private generator so building tables never disturbs the game's random state
+    rng = random.Random(0x5EED)
+    return tuple(rng.getrandbits(64) for _ in range(count))
+
+
+def _mix64(x: int) -> int:
+    """splitmix64 finaliser: spread an integer over 64 well-mixed bits."""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+@dataclass
+class KnowledgeState:
+    """Everything a KnowledgeBase knows, as plain values (see KnowledgeBase.state).
+
+    Cells are per-holder bitmasks over card ids, holders being the players
+    followed by the envelope; prob and bias are card-major, one column per
+    player.
+    """
+    owner: str
+    exact: bool
+    players: List[str]
+    hand_sizes: Optional[List[int]]
+    has: List[int]
+    has_not: List[int]
+    clauses: List[Tuple[int, int]]
+    refuted: int
+    prob: array
+    bias: array
+    envelope: array
+    raw_envelope: array
+    prob_dirty: int
+    exact_probabilities: bool
+    fingerprint: int
+    revision: int
+    prob_invalidations: int
+    prob_recomputes: int
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Yield the index of every set bit in mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class CardArrayView(MutableMapping):
+    """Dict-style view, keyed by card key, of one column of a flat
+    (cards x width) float array. Reads and writes go straight to the array."""
+
+    __slots__ = ("_data", "_index", "_column", "_width")
+
+    def __init__(self, data: array, index: Dict[str, int], column: int = 0, width: int = 1):
+        self._data = data
+        self._index = index
+        self._column = column
+        self._width = width
+
+    def __getitem__(self, ck: str) -> float:
+        return self._data[self._index[ck] * self._width + self._column]
+
+    def __setitem__(self, ck: str, value: float) -> None:
+        self._data[self._index[ck] * self._width + self._column] = value
+
+    def __delitem__(self, ck: str) -> None:
+        raise TypeError("cards cannot be removed from a probability view")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
 
 class KnowledgeBase:
-    def __init__(self, owner: str):
+    def __init__(self, owner: str, exact: bool = False):
         self.owner = owner
+        # Exact mode derives probabilities by counting consistent deals (needs hand sizes)
+        self.exact = exact
         self.players: List[str] = []
-        # Certainty matrix: matrix[card_key][holder] -> True/False/None (None = unknown)
-        self.matrix: Dict[str, Dict[str, Optional[bool]]] = {}
+        self.hand_sizes: Optional[List[int]] = None
+        # Holders are the players followed by the envelope. Each holder keeps two
+        # bitmasks over card indices: cards it certainly has / certainly has not.
+        # A card with neither bit set is unknown for that holder.
+        self.holders: List[str] = []
+        self._holder_index: Dict[str, int] = {}
+        self._envelope = 0
+        self._has: List[int] = []
+        self._has_not: List[int] = []
+
+        # Cards are indexed by their registry id, so a card's bit is 1 << card.id
+        self.cards: List[Card] = []
+        self._keys: List[str] = []
+        self._card_index: Dict[str, int] = {}
+        self._category_of: Dict[str, CardType] = {}
+        self._card_category: List[CardType] = []
+        # Deck categories in the order solutions list them, and their cards
+        self.categories: Tuple[CardType, ...] = ()
+        self._category_cards: Dict[str, Tuple[Card, ...]] = {}
+        self._category_masks: Dict[str, int] = {}
+        self._all_mask = 0
+
+        # Worklist for incremental propagation: cards whose column changed and still
+        # need re-examining, and cards whose probabilities are out of date.
+        self._dirty = 0
+        self._prob_dirty = 0
+        # Newly excluded cells as (holder, card mask), waiting to wake their clause watchers
+        self._falsified: List[Tuple[int, int]] = []
+        # Per-holder counts of held / excluded cards, kept in step with the bitmasks,
+        # and a bitmask of holders whose counts changed since the last check
+        self._held_count: List[int] = []
+        self._excluded_count: List[int] = []
+        self._holders_dirty = 0
+
         # Cards that have been revealed/refuted at least once
         self.refuted_cards: set[str] = set()
-
-        # Probability tracking
-        self.prob_matrix: Dict[str, Dict[str, float]] = {}
-        self.envelope_probs: Dict[str, float] = {}
+        # "has at least one of" facts as (holder index, card mask). Each clause
+        # watches two of its cards that are not yet excluded; _watches maps a
+        # watched cell (holder * card count + card) to the clauses watching it.
+        self._clauses: List[Tuple[int, int]] = []
+        self._clause_watch: List[List[int]] = []
+        self._watches: Dict[int, List[int]] = {}
+
+        # Probability tracking. Values live in flat float arrays indexed by card id
+        # (card-major, one column per player); the dicts are views onto them.
+        self._prob = array("d")
+        self._bias = array("d")
+        self._envelope_p = array("d")
+        # Envelope weights before per-category normalisation and blending
+        self._raw_envelope = array("d")
+        self._prob_views: Dict[str, CardArrayView] = {}
+        self._envelope_view = CardArrayView(self._envelope_p, {})
         # Soft weights to bias probability among unknown holders (for "has one of" hints)
-        self.bias_matrix: Dict[str, Dict[str, float]] = {}
-
-    def initialize(self, players: List[str], all_cards: List[Card], my_hand: List[Card]) -> None:
+        self.bias_matrix: Dict[str, CardArrayView] = {}
+        self._exact_probabilities = False
+        # Envelope nudges (card index -> amount) made while the card's probability
+        # was stale; they are added once it is recomputed
+        self._nudges: Dict[int, float] = {}
+        # Open cards (more than one possible place) when exact counting last ran
+        # out of budget; it is only retried once far fewer cards are open
+        self._exact_gave_up: Optional[int] = None
+
+        # Probabilities are recomputed lazily, on the first read after a change.
+        # revision counts fact changes; the counters show how much work laziness saved.
+        self.revision = 0
+        self.prob_invalidations = 0
+        self.prob_recomputes = 0
+
+        # Additive Zobrist hash of everything decisions depend on: each known cell
+        # adds its key (removed again if the cell is ever cleared), and each clause,
+        # bias bump, envelope nudge and first showing of a card adds one. Equal
+        # fingerprints mean equal knowledge, whatever order it arrived in.
+        self._fingerprint = 0
+        self._zobrist: Tuple[int, ...] = ()
+        # Fingerprint when revision last advanced (None: count the next change)
+        self._revision_fingerprint: Optional[int] = None
+
+    def initialize(self, players: List[str], all_cards: List[Card], my_hand: List[Card],
+                   hand_sizes: Optional[Dict[str, int]] = None) -> None:
         self.players = players[:]
-        holders = players + [ENVELOPE]
-
+        self._exact_gave_up = None
+        self._nudges = {}
+        self.hand_sizes = [hand_sizes[p]
+                           for p in players] if hand_sizes is not None else None
+        self._clauses = []
+        self._clause_watch = []
+        self._watches = {}
+        self._falsified = []
+        self.holders = players + [ENVELOPE]
+        self._holder_index = {h: i for i, h in enumerate(self.holders)}
+        self._envelope = len(players)
+        self._has = [0] * len(self.holders)
+        self._has_not = [0] * len(self.holders)
+        self._held_count = [0] * len(self.holders)
+        self._excluded_count = [0] * len(self.holders)
+        self._holders_dirty = 0
+
+        size = max(card_id(c) for c in all_cards) + 1 if all_cards else 0
+        self.cards = [None] * size  # type: ignore[list-item]
+        self._keys = [""] * size
+        self._card_category = [""] * size  # type: ignore[list-item]
+        self.categories = tuple(dict.fromkeys(c.type for c in all_cards))
+        self._category_cards = {cat: tuple(c for c in all_cards if c.type == cat)
+                                for cat in self.categories}
+        self._category_masks = {cat: 0 for cat in self.categories}
+        self._all_mask = 0
         for c in all_cards:
-            ck = card_key(c)
-            self.matrix[ck] = {h: None for h in holders}
-
-        # Own hand known
+            i = card_id(c)
+            self.cards[i], self._keys[i], self._card_category[i] = c, c.key, c.type
+            self._category_masks[c.type] |= 1 << i
+            self._all_mask |= 1 << i
+        self._card_index = {c.key: card_id(c) for c in all_cards}
+        self._category_of = {c.key: c.type for c in all_cards}
+        self._dirty = self._prob_dirty = self._all_mask
+        self._fingerprint = 0
+        self._revision_fingerprint = None
+        self._zobrist = _zobrist_keys(4 * len(self.holders) * size)
+
+        # Own hand known (and so neither anyone else's nor in the envelope)
         for c in my_hand:
-            ck = card_key(c)
-            for h in holders:
-                self.matrix[ck][h] = (h == self.owner)
-
-        # Can't be both in hand and envelope
-        for c in all_cards:
-            ck = card_key(c)
-            if self.matrix[ck][self.owner]:
-                self.matrix[ck][ENVELOPE] = False
+            self._set_holder(self._holder_index[self.owner], self._bit(c))
 
         # Initialise probability structures
-        self.prob_matrix = {p: {ck: 0.0 for ck in self.matrix}
-                            for p in players}
-        self.envelope_probs = {
-            ck: 1.0 / len(category_cards(self.category_of_key(ck)))
-            for ck in self.matrix
-        }
-        self.bias_matrix = {p: {ck: 1.0 for ck in self.matrix}
-                            for p in players}
+        n_players = len(players)
+        self._prob = array("d", bytes(8 * size * n_players))
+        self._bias = array("d", [1.0]) * (size * n_players)
+        self._envelope_p = array("d", bytes(8 * size))
+        for mask in self._category_masks.values():
+            for i in iter_bits(mask):
+                self._envelope_p[i] = 1.0 / mask.bit_count()
+        self._raw_envelope = array("d", self._envelope_p)
+        self._prob_views = {p: CardArrayView(self._prob, self._card_index, h, n_players)
+                            for h, p in enumerate(players)}
+        self._envelope_view = CardArrayView(self._envelope_p, self._card_index)
+        self.bias_matrix = {p: CardArrayView(self._bias, self._card_index, h, n_players)
+                            for h, p in enumerate(players)}
 
         self._propagate()
 
+    def state(self) -> KnowledgeState:
+        """Copy of the current knowledge, for saving (see logic.snapshot)."""
+        if self._nudges:
+            # Waiting nudges are not part of the saved format
+            self._refresh_probabilities()
+        refuted = 0
+        for ck in self.refuted_cards:
+            refuted |= 1 << self._card_index[ck]
+        return KnowledgeState(
+            self.owner, self.exact, self.players[:],
+            self.hand_sizes[:] if self.hand_sizes is not None else None,
+            self._has[:], self._has_not[:], self._clauses[:], refuted,
+            array("d", self._prob), array("d", self._bias),
+            array("d", self._envelope_p), array("d", self._raw_envelope),
+            self._prob_dirty, self._exact_probabilities, self._fingerprint,
+            self.revision, self.prob_invalidations, self.prob_recomputes)
+
+    def restore(self, state: KnowledgeState, all_cards: List[Card]) -> None:
+        """Replace this knowledge base's contents with a saved state.
+
+        all_cards must be the cards the state was built over; the state is
+        taken as already propagated.
+        """
+        self.owner, self.exact = state.owner, state.exact
+        self.initialize(state.players, all_cards, [],
+                        dict(zip(state.players, state.hand_sizes))
+                        if state.hand_sizes is not None else None)
+        self._has, self._has_not = state.has[:], state.has_not[:]
+        self._held_count = [m.bit_count() for m in self._has]
+        self._excluded_count = [m.bit_count() for m in self._has_not]
+        self._dirty = self._holders_dirty = 0
+        self._falsified = []
+        self.refuted_cards = {self._keys[i] for i in iter_bits(state.refuted)}
+
+        # Re-watch two open cards of every clause that is still undecided
+        stride = len(self.cards)
+        self._clauses = state.clauses[:]
+        self._clause_watch = []
+        self._watches = {}
+        for idx, (h, mask) in enumerate(self._clauses):
+            watch: List[int] = []
+            open_cards = mask & ~self._has_not[h]
+            if not self._has[h] & mask and open_cards.bit_count() >= 2:
+                first = open_cards.bit_length() - 1
+                second = (open_cards & ~(1 << first)).bit_length() - 1
+                watch.extend((first, second))
+                for i in watch:
+                    self._watches.setdefault(h * stride + i, []).append(idx)
+            self._clause_watch.append(watch)
+
+        self._prob[:] = state.prob
+        self._bias[:] = state.bias
+        self._envelope_p[:] = state.envelope
+        self._raw_envelope[:] = state.raw_envelope
+        self._prob_dirty = state.prob_dirty
+        self._exact_probabilities = state.exact_probabilities
+        self._fingerprint = self._revision_fingerprint = state.fingerprint
+        self.revision = state.revision
+        self.prob_invalidations = state.prob_invalidations
+        self.prob_recomputes = state.prob_recomputes
+
+    @property
+    def prob_matrix(self) -> Dict[str, CardArrayView]:
+        """prob_matrix[player][card_key] -> probability that player holds the card."""
+        self._refresh_probabilities()
+        return self._prob_views
+
+    @property
+    def envelope_probs(self) -> CardArrayView:
+        """envelope_probs[card_key] -> probability that the card is in the envelope."""
+        self._refresh_probabilities()
+        return self._envelope_view
+
+    @property
+    def probabilities_exact(self) -> bool:
+        """Whether the current probabilities came from exact counting."""
+        self._refresh_probabilities()
+        return self._exact_probabilities
+
+    @property
+    def fingerprint(self) -> int:
+        """64-bit hash of the current knowledge, maintained incrementally."""
+        return self._fingerprint
+
+    @property
+    def recomputes_avoided(self) -> int:
+        """Fact changes that did not need their own probability recomputation."""
+        return self.prob_invalidations - self.prob_recomputes
+
+    def _refresh_probabilities(self) -> None:
+        if self._prob_dirty:
+            self.update_probabilities(self._prob_dirty)
+
+    @property
+    def matrix(self) -> Dict[str, Dict[str, Optional[bool]]]:
+        """Snapshot of the certainty matrix as matrix[card_key][holder] -> True/False/None.
+
+        Built on demand from the bitmasks; prefer is_known_to_player() in hot code.
+        """
+        view: Dict[str, Dict[str, Optional[bool]]] = {}
+        for ck, i in self._card_index.items():
+            bit = 1 << i
+            view[ck] = {
+                h: True if self._has[hi] & bit else False if self._has_not[hi] & bit else None
+                for hi, h in enumerate(self.holders)
+            }
+        return view
+
+    def category_cards(self, cat: CardType) -> Tuple[Card, ...]:
+        return self._category_cards[cat]
+
     def category_of_key(self, ck: str) -> CardType:
-        for cat in ("Suspect", "Weapon", "Room"):
-            if ck in [card_key(c) for c in category_cards(cat)]:
-                return cat  # type: ignore[return-value]
-        raise ValueError(f"Unknown card key {ck}")
+        try:
+            return self._category_of[ck]
+        except KeyError:
+            raise ValueError(f"Unknown card key {ck}") from None
+
+    def _bit(self, card: Card) -> int:
+        return 1 << (card.id if card.id >= 0 else self._card_index[card.key])
+
+    def _hash_cells(self, kind: int, holder: int, mask: int, sign: int = 1) -> None:
+        """Add (sign=1) or remove (sign=-1) the Zobrist keys of these cells."""
+        base = (kind * len(self.holders) + holder) * len(self.cards)
+        keys = self._zobrist
+        total = sum(keys[base + i] for i in iter_bits(mask))
+        self._fingerprint = (self._fingerprint + sign * total) & _MASK64
+
+    def _set_holder(self, holder: int, bit: int) -> None:
+        """Record that `holder` has the card(s) in bit and every other holder does not."""
+        for h in range(len(self.holders)):
+            if h == holder:
+                cleared, new = self._has_not[h] & bit, bit & ~self._has[h]
+                self._excluded_count[h] -= cleared.bit_count()
+                self._held_count[h] += new.bit_count()
+                self._has[h] |= bit
+                self._has_not[h] &= ~bit
+                kind_new, kind_cleared = _HAS, _HAS_NOT
+            else:
+                cleared, new = self._has[h] & bit, bit & ~self._has_not[h]
+                if new:
+                    self._falsified.append((h, new))
+                self._held_count[h] -= cleared.bit_count()
+                self._excluded_count[h] += new.bit_count()
+                self._has_not[h] |= bit
+                self._has[h] &= ~bit
+                kind_new, kind_cleared = _HAS_NOT, _HAS
+            if new:
+                self._hash_cells(kind_new, h, new)
+            if cleared:
+                self._hash_cells(kind_cleared, h, cleared, -1)
+        self._dirty |= bit
+        self._holders_dirty |= (1 << len(self.holders)) - 1
+
+    def _mark_has(self, holder: int, mask: int) -> None:
+        """Record a deduction that `holder` has the cards in mask."""
+        new = mask & ~self._has[holder]
+        if new:
+            self._has[holder] |= new
+            self._held_count[holder] += new.bit_count()
+            self._hash_cells(_HAS, holder, new)
+            self._dirty |= new
+            self._holders_dirty |= 1 << holder
+
+    def _exclude(self, holder: int, mask: int) -> None:
+        """Record that `holder` has none of the unknown cards in mask."""
+        new = mask & ~(self._has[holder] | self._has_not[holder])
+        if new:
+            self._has_not[holder] |= new
+            self._excluded_count[holder] += new.bit_count()
+            self._hash_cells(_HAS_NOT, holder, new)
+            self._dirty |= new
+            self._holders_dirty |= 1 << holder
+            self._falsified.append((holder, new))
+
+    def _add_clause(self, holder: int, mask: int) -> None:
+        """Store "holder has at least one of mask" and watch two of its open cards."""
+        self._clauses.append((holder, mask))
+        self._fingerprint = (self._fingerprint +
+                             _mix64(hash((holder, mask)) & _MASK64)) & _MASK64
+        watch: List[int] = []
+        self._clause_watch.append(watch)
+        open_cards = mask & ~self._has_not[holder]
+        if self._has[holder] & mask or not open_cards:
+            return
+        first = open_cards.bit_length() - 1
+        rest = open_cards & ~(1 << first)
+        if not rest:
+            # Only one card left that could satisfy it
+            self._mark_has(holder, open_cards)
+            return
+        second = rest.bit_length() - 1
+        idx = len(self._clauses) - 1
+        watch.extend((first, second))
+        stride = len(self.cards)
+        self._watches.setdefault(holder * stride + first, []).append(idx)
+        self._watches.setdefault(holder * stride + second, []).append(idx)
+
+    def _wake_watchers(self, holder: int, card: int) -> None:
+        """Card was just excluded for holder: move each watching clause to another
+        open card, or force its other watched card when none is left."""
+        stride = len(self.cards)
+        watchers = self._watches.pop(holder * stride + card, None)
+        if not watchers:
+            return
+        keep = []
+        for idx in watchers:
+            h, mask = self._clauses[idx]
+            watch = self._clause_watch[idx]
+            other = watch[1] if watch[0] == card else watch[0]
+            if self._has[h] & mask:
+                keep.append(idx)  # already satisfied
+                continue
+            replacement = mask & ~self._has_not[h] & ~(1 << other)
+            if replacement:
+                new = replacement.bit_length() - 1
+                watch[watch.index(card)] = new
+                self._watches.setdefault(h * stride + new, []).append(idx)
+                continue
+            keep.append(idx)
+            if not self._has_not[h] >> other & 1:
+                self._mark_has(h, 1 << other)
+        if keep:
+            self._watches[holder * stride + card] = keep
+
+    def _player_held_mask(self) -> int:
+        held = 0
+        for h in range(self._envelope):
+            held |= self._has[h]
+        return held
 
     def note_has_card(self, player: str, card: Card) -> None:
-        ck = card_key(card)
-        for h in self.matrix[ck]:
-            self.matrix[ck][h] = (h == player)
-        self.refuted_cards.add(ck)
+        self._record_has(player, card)
         self._propagate()
 
     def note_cannot_have_any(self, player: str, cards: List[Card]) -> None:
-        for c in cards:
-            ck = card_key(c)
-            if player in self.matrix[ck] and self.matrix[ck][player] is not True:
-                self.matrix[ck][player] = False
+        self._record_cannot_have_any(player, cards)
         self._propagate()
 
     def note_has_one_of(self, player: str, cards: List[Card]) -> None:
-        # Soft-evidence: bump bias toward these cards for that player if unknown
-        cks = [card_key(c) for c in cards]
-        unknowns = [ck for ck in cks if self.matrix[ck][player] is None]
-        if not unknowns:
-            return
-        for ck in unknowns:
-            self.bias_matrix[player][ck] += 1.0
+        if self._record_has_one_of(player, cards):
+            self._propagate()
+
+    def apply_events(self, facts: Iterable[Fact]) -> None:
+        """Record a batch of facts, then propagate once. Duplicates are applied once."""
+        for fact in dict.fromkeys(facts):
+            if fact.kind == "has":
+                self._record_has(fact.holder, fact.cards[0])
+            elif fact.kind == "cannot_have_any":
+                self._record_cannot_have_any(fact.holder, fact.cards)
+            elif fact.kind == "has_one_of":
+                self._record_has_one_of(fact.holder, fact.cards)
+            elif fact.kind == "envelope":
+                self._record_envelope(fact.cards[0])
+            else:
+                raise ValueError(f"Unknown fact kind {fact.kind!r}")
         self._propagate()
 
+    def _record_has(self, player: str, card: Card) -> None:
+        self._set_holder(self._holder_index[player], self._bit(card))
+        ck = card_key(card)
+        if ck not in self.refuted_cards:
+            # Strategies read refuted_cards, so it is part of the fingerprint
+            self.refuted_cards.add(ck)
+            self._hash_cells(_REFUTED, 0, self._bit(card))
+
+    def _record_cannot_have_any(self, player: str, cards: Iterable[Card]) -> None:
+        h = self._holder_index.get(player)
+        if h is not None:
+            mask = 0
+            for c in cards:
+                mask |= self._bit(c)
+            self._exclude(h, mask)
+
+    def _record_has_one_of(self, player: str, cards: Iterable[Card]) -> bool:
+        """Store the clause and bump bias toward its unknown cards; False if nothing new."""
+        h = self._holder_index[player]
+        mask = 0
+        for c in cards:
+            mask |= self._bit(c)
+        if self._has[h] & mask:
+            return False
+        unknowns = mask & ~self._has_not[h]
+        if not unknowns:
+            return False
+        self._add_clause(h, mask)
+        # Soft-evidence: bump bias toward these cards for that player
+        n_players = len(self.players)
+        for i in iter_bits(unknowns):
+            self._bias[i * n_players + h] += 1.0
+        self._hash_cells(_SOFT, h, unknowns)
+        self._prob_dirty |= unknowns
+        return True
+
+    def _record_envelope(self, card: Card) -> None:
+        self._set_holder(self._envelope, self._bit(card))
+        self._envelope_p[card_id(card)] = 1.0
+
     def is_card_resolved(self, card: Card) -> bool:
-        vals = self.matrix.get(card_key(card), {}).values()
-        return list(vals).count(True) == 1
+        if card.key not in self._card_index:
+            return False
+        bit = self._bit(card)
+        return sum(1 for m in self._has if m & bit) == 1
 
     def holder_of(self, card: Card) -> Optional[str]:
-        for h, v in self.matrix.get(card_key(card), {}).items():
-            if v is True:
-                return h
+        if card.key not in self._card_index:
+            return None
+        bit = self._bit(card)
+        for h, m in enumerate(self._has):
+            if m & bit:
+                return self.holders[h]
         return None
 
-    def possible_in_envelope(self, cat: CardType) -> List[Card]:
-        res = []
-        for c in category_cards(cat):
-            ck = card_key(c)
-            v = self.matrix[ck][ENVELOPE]
-            if v is not False and self.holder_of(c) is None:
-                res.append(c)
-        return res
-
-    def confirmed_solution(self) -> Optional[Tuple[Card, Card, Card]]:
-        suspects = [c for c in category_cards(
-            "Suspect") if self.matrix[card_key(c)][ENVELOPE] is True]
-        weapons = [c for c in category_cards(
-            "Weapon") if self.matrix[card_key(c)][ENVELOPE] is True]
-        rooms = [c for c in category_cards(
-            "Room") if self.matrix[card_key(c)][ENVELOPE] is True]
-        if len(suspects) == len(weapons) == len(rooms) == 1:
-            return suspects[0], weapons[0], rooms[0]
-        return None
+    def _envelope_candidates(self, cat: CardType) -> int:
+        return (self._category_masks[cat] & ~self._has_not[self._envelope]
+                & ~self._player_held_mask())
 
-    def current_solution_guess(self) -> Optional[Tuple[Card, Card, Card]]:
-        def single(cat: CardType):
-            cand = self.possible_in_envelope(cat)
-            return cand[0] if len(cand) == 1 else None
-        s, w, r = single("Suspect"), single("Weapon"), single("Room")
-        return (s, w, r) if s and w and r else None
+    def possible_in_envelope(self, cat: CardType) -> List[Card]:
+        return [self.cards[i] for i in iter_bits(self._envelope_candidates(cat))]
+
+    def confirmed_solution(self) -> Optional[Tuple[Card, ...]]:
+        env = self._has[self._envelope]
+        found = []
+        for cat in self.categories:
+            in_env = env & self._category_masks[cat]
+            if in_env.bit_count() != 1:
+                return None
+            found.append(self.cards[in_env.bit_length() - 1])
+        return tuple(found)
+
+    def current_solution_guess(self) -> Optional[Tuple[Card, ...]]:
+        found = []
+        for cat in self.categories:
+            cand = self._envelope_candidates(cat)
+            if cand.bit_count() != 1:
+                return None
+            found.append(self.cards[cand.bit_length() - 1])
+        return tuple(found)
 
     def is_known_to_player(self, player: str, card: Card) -> Optional[bool]:
-        return self.matrix[card_key(card)].get(player)
+        h = self._holder_index.get(player)
+        if h is None:
+            return None
+        bit = self._bit(card)
+        if self._has[h] & bit:
+            return True
+        if self._has_not[h] & bit:
+            return False
+        return None
 
     def has_been_refuted_before(self, card: Card) -> bool:
         return card_key(card) in self.refuted_cards
 
     def mark_envelope(self, card: Card) -> None:
         """Force-mark this card as definitively in the envelope."""
-        ck = card_key(card)
-        self.matrix[ck][ENVELOPE] = True
-        for p in self.players:
-            self.matrix[ck][p] = False
-        self.envelope_probs[ck] = 1.0
+        self._record_envelope(card)
         self._propagate()
 
-    def update_probabilities(self) -> None:
-        old_probs = self.envelope_probs.copy()
+    def nudge_envelope(self, card: Card, amount: float) -> None:
+        """Soft evidence: raise the card's envelope probability by amount (capped at 1).
+
+        The nudge lasts until the card's category is next recomputed, where it
+        survives only through the blending with previous values. A nudge to a
+        stale probability waits for that recompute instead of forcing it.
+        """
+        bit = self._bit(card)
+        i = bit.bit_length() - 1
+        if self._prob_dirty & bit:
+            self._nudges[i] = self._nudges.get(i, 0.0) + amount
+        else:
+            self._envelope_p[i] = min(1.0, self._envelope_p[i] + amount)
+        self._hash_cells(_SOFT, self._envelope, bit)
+
+    def _apply_nudges(self, cards: int) -> None:
+        """Add the waiting nudges of the just-recomputed cards in `cards`."""
+        for i in [i for i in self._nudges if cards >> i & 1]:
+            self._envelope_p[i] = min(1.0, self._envelope_p[i] + self._nudges.pop(i))
+
+    def update_probabilities(self, cards: Optional[int] = None) -> None:
+        """Recompute probabilities for the cards in the `cards` bitmask (default: all).
+
+        Normally called lazily through the probability properties; calling it
+        directly forces a recomputation.
+
+        Per-category normalisation and blending are redone for every category
+        that contains one of those cards; other categories are left untouched.
+        """
+        self._prob_dirty = 0 if cards is None else self._prob_dirty & ~cards
+        self.prob_recomputes += 1
+
+        marginals = self._exact_marginals()
+        self._exact_probabilities = marginals is not None
+        if marginals is not None:
+            self._prob_dirty = 0
+            self._apply_marginals(marginals)
+            self._apply_nudges(self._all_mask)
+            return
+
+        if cards is None:
+            cards = self._all_mask
+        env = self._envelope
+        n_players = len(self.players)
+        has, has_not = self._has, self._has_not
+        env_has, env_has_not = has[env], has_not[env]
+        player_held = self._player_held_mask()
+        prob, bias, raw = self._prob, self._bias, self._raw_envelope
+        zeros = array("d", bytes(8 * n_players))
+
         # First pass: assign raw probabilities per card from holder constraints and bias
-        for ck, holders in self.matrix.items():
+        for i in iter_bits(cards):
+            bit = 1 << i
+            row = i * n_players
+            prob[row:row + n_players] = zeros
+
             # Known holder
-            definite_holder = next(
-                (p for p, v in holders.items() if v is True and p != ENVELOPE), None)
-            if definite_holder:
-                for p in self.players:
-                    self.prob_matrix[p][ck] = 1.0 if p == definite_holder else 0.0
-                self.envelope_probs[ck] = 0.0
+            if player_held & bit:
+                for h in range(n_players):
+                    if has[h] & bit:
+                        prob[row + h] = 1.0
+                raw[i] = 0.0
                 continue
 
-            # Confirmed in envelope
-            if holders[ENVELOPE] is True:
-                for p in self.players:
-                    self.prob_matrix[p][ck] = 0.0
-                self.envelope_probs[ck] = 1.0
-                continue
+            unknown_players = [h for h in range(n_players)
+                               if not has_not[h] & bit]
 
-            # All players known not to have it -> must be envelope
-            if all(holders[p] is False for p in self.players):
-                for p in self.players:
-                    self.prob_matrix[p][ck] = 0.0
-                self.envelope_probs[ck] = 1.0
+            # Confirmed in envelope, or all players known not to have it
+            if env_has & bit or not unknown_players:
+                raw[i] = 1.0
                 continue
 
             # Proportional distribution among unknown players + envelope
-            unknown_players = [p for p in self.players if holders[p] is None]
-            env_unknown = holders[ENVELOPE] is None
-            env_weight = 1.0 if env_unknown else 0.0
-            weights = {p: self.bias_matrix[p][ck] for p in unknown_players}
-            total_weight = env_weight + sum(weights.values())
-
+            env_weight = 0.0 if env_has_not & bit else 1.0
+            total_weight = env_weight + \
+                sum(bias[row + h] for h in unknown_players)
             if total_weight > 0:
-                for p in self.players:
-                    self.prob_matrix[p][ck] = (
-                        weights[p] / total_weight) if p in weights else 0.0
-                self.envelope_probs[ck] = env_weight / total_weight
+                for h in unknown_players:
+                    prob[row + h] = bias[row + h] / total_weight
+                raw[i] = env_weight / total_weight
             else:
                 # Fallback safety
-                for p in self.players:
-                    self.prob_matrix[p][ck] = 0.0
-                self.envelope_probs[ck] = 0.0
-
-        # Second pass: enforce category constraint — envelope probs sum to 1 per category
-        for cat in ("Suspect", "Weapon", "Room"):
-            cks = [card_key(c) for c in category_cards(cat)]
-            candidates = [
-                ck for ck in cks
-                if self.matrix[ck][ENVELOPE] is not False
-                and not any(self.matrix[ck][p] is True for p in self.players)
-            ]
-            if not candidates:
-                continue
-            total_env = sum(self.envelope_probs[ck] for ck in candidates)
-            if total_env > 0:
-                for ck in candidates:
-                    self.envelope_probs[ck] = self.envelope_probs[ck] / total_env
-            else:
-                even = 1.0 / len(candidates)
-                for ck in candidates:
-                    self.envelope_probs[ck] = even
+                raw[i] = 0.0
 
-        # --- MEMORY BLENDING: preserve soft bumps but allow decay ---
-        for ck in self.envelope_probs:
-            self.envelope_probs[ck] = 0.8 * \
-                self.envelope_probs[ck] + 0.2 * old_probs[ck]
+        envelope_p = self._envelope_p
+        for cat, mask in self._category_masks.items():
+            if not mask & cards:
+                continue
+            # Second pass: enforce category constraint — envelope probs sum to 1 per category
+            candidates = self._envelope_candidates(cat)
+            total_env = sum(raw[i] for i in iter_bits(candidates))
+            even = 1.0 / candidates.bit_count() if candidates else 0.0
+
+            # --- MEMORY BLENDING: preserve soft bumps but allow decay ---
+            for i in iter_bits(mask):
+                new = raw[i]
+                if candidates >> i & 1:
+                    new = new / total_env if total_env > 0 else even
+                envelope_p[i] = 0.8 * new + 0.2 * envelope_p[i]
+        self._apply_nudges(cards)
+
+    def _exact_marginals(self) -> Optional[Tuple[Tuple[float, ...], ...]]:
+        """Per-card slot probabilities from exact counting, or None if unavailable.
+
+        Slots are the players in order followed by one envelope slot per category.
+        """
+        if not self.exact or self.hand_sizes is None:
+            return None
+        env = self._envelope
+        env_slot = {cat: env + k for k, cat in enumerate(self.categories)}
+        allowed = []
+        for i, cat in enumerate(self._card_category):
+            bit = 1 << i
+            if not self._all_mask & bit:
+                allowed.append(0)
+                continue
+            slots = 0
+            for h in range(env):
+                if not self._has_not[h] & bit:
+                    slots |= 1 << h
+            if not self._has_not[env] & bit:
+                slots |= 1 << env_slot[cat]
+            allowed.append(slots)
+        # Canonical clause set: drop satisfied clauses and cards already ruled out
+        clauses = tuple(sorted({
+            (h, mask & ~self._has_not[h]) for h, mask in self._clauses
+            if not self._has[h] & mask
+        }))
+        open_cards = sum(1 for slots in allowed if slots & (slots - 1))
+        if self._exact_gave_up is not None and open_cards > self._exact_gave_up * 3 // 4:
+            return None
+        capacities = tuple(self.hand_sizes) + (1,) * len(self.categories)
+        marginals = card_marginals(tuple(allowed), capacities, clauses)
+        if marginals is None:
+            self._exact_gave_up = open_cards
+        return marginals
+
+    def _apply_marginals(self, marginals: Tuple[Tuple[float, ...], ...]) -> None:
+        env = self._envelope
+        env_slot = {cat: env + k for k, cat in enumerate(self.categories)}
+        for i in iter_bits(self._all_mask):
+            row = marginals[i]
+            self._prob[i * env:(i + 1) * env] = array("d", row[:env])
+            self._envelope_p[i] = row[env_slot[self._card_category[i]]]
 
     def _propagate(self) -> None:
-        # Card exclusivity
-        for ck, row in self.matrix.items():
-            trues = [h for h, v in row.items() if v is True]
-            if len(trues) == 1:
-                for h in row:
-                    if h != trues[0]:
-                        row[h] = False
-            falses = [h for h, v in row.items() if v is False]
-            if len(falses) == len(row) - 1:
-                for h in row:
-                    if row[h] is None:
-                        row[h] = True
-
-        # Category exclusivity
-        for cat in ("Suspect", "Weapon", "Room"):
-            cks = [card_key(c) for c in category_cards(cat)]
-            candidates = [ck for ck in cks if self.matrix[ck]
-                          [ENVELOPE] is not False]
-            if len(candidates) == 1:
-                self.matrix[candidates[0]][ENVELOPE] = True
-                for ck in cks:
-                    if ck != candidates[0] and self.matrix[ck][ENVELOPE] is None:
-                        self.matrix[ck][ENVELOPE] = False
-
-        self.update_probabilities()
+        """Run deductions from the dirty cards until nothing changes.
+
+        Only the columns of cards whose cells changed (and the categories they
+        belong to) are re-examined, only clauses watching a newly excluded cell
+        are visited, and only holders whose counts changed are checked against
+        their hand size; any new deduction re-queues its card.
+        """
+        env = self._envelope
+        n_holders = len(self.holders)
+        n_cards = self._all_mask.bit_count()
+        while self._dirty or self._falsified or self._holders_dirty:
+            falsified, self._falsified = self._falsified, []
+            for h, mask in falsified:
+                for i in iter_bits(mask):
+                    self._wake_watchers(h, i)
+
+            dirty, self._dirty = self._dirty, 0
+            self._prob_dirty |= dirty
+            categories = set()
+
+            for i in iter_bits(dirty):
+                bit = 1 << i
+                categories.add(self._card_category[i])
+                owner = next(
+                    (h for h in range(n_holders) if self._has[h] & bit), None)
+                if owner is not None:
+                    # Card exclusivity: a card held by one holder is held by no other
+                    for h in range(n_holders):
+                        if h != owner:
+                            self._exclude(h, bit)
+                    continue
+                # A card every holder but one is known to lack belongs to that one
+                open_holders = [h for h in range(n_holders)
+                                if not self._has_not[h] & bit]
+                if len(open_holders) == 1:
+                    self._mark_has(open_holders[0], bit)
+
+            # Category exclusivity: the envelope holds exactly one card per category
+            for cat in categories:
+                mask = self._category_masks[cat]
+                candidates = mask & ~self._has_not[env]
+                if candidates.bit_count() == 1:
+                    self._mark_has(env, candidates)
+                if self._has[env] & mask:
+                    self._exclude(env, mask & ~self._has[env])
+
+            # Hand sizes: a full hand holds nothing else, and a hand with exactly
+            # as many open cards as free slots holds all of them
+            holders, self._holders_dirty = self._holders_dirty, 0
+            if self.hand_sizes is not None:
+                for h in iter_bits(holders & ((1 << env) - 1)):
+                    free = self.hand_sizes[h] - self._held_count[h]
+                    if not free:
+                        if self._held_count[h] + self._excluded_count[h] < n_cards:
+                            self._exclude(h, self._all_mask & ~self._has[h])
+                    elif free == n_cards - self._held_count[h] - self._excluded_count[h]:
+                        self._mark_has(h, self._all_mask & ~(
+                            self._has[h] | self._has_not[h]))
+
+        # Probabilities for the touched cards are refreshed on the next read.
+        # Only knowledge learned since the last revision counts: re-noting a
+        # known fact leaves the fingerprint, and so the counters, unchanged.
+        if self._prob_dirty and self._fingerprint != self._revision_fingerprint:
+            self._revision_fingerprint = self._fingerprint
+            self.revision += 1
+            self.prob_invalidations += 1
@@ -0,0 +1,216 @@
+"""Expected-information-gain suggestion planner.
+
+Scores every guess of one card per category by the entropy of what the
+suggester will observe: who refutes (walking the seat order after the
+suggester) and which card they show. Holder probabilities come from the
+knowledge base and are treated as independent per card. A responder known
+to hold one of the cards is assumed to show that one, as players prefer
+showing cards the suggester has already seen.
+
+Large decks are pruned: when there are more than MAX_COMBINATIONS guesses to
+score, each category keeps only its most promising cards.
+
+best() does not score every guess. Information is at most log(outcomes)
+nats, small next to ENVELOPE_WEIGHT, so guesses are visited by envelope
+score and the search stops once none left can overtake the best so far.
+"""
+from itertools import islice, product
+from math import log
+from typing import Dict, List, Optional, Tuple
+
+from logic.knowledge_base import KnowledgeBase
+from models.cards import Card, card_key
+
+# One card per deck category, in category order
+Guess = Tuple[Card, ...]
+
+# Nats of expected information one point of summed envelope probability is
+# worth; high enough that, among comparably likely guesses, information only
+# breaks ties (tuned with logic.simulate)
+ENVELOPE_WEIGHT = 10.0
+
+# Most distinct guesses scored (and returned by ranked()) per decision
+MAX_COMBINATIONS = 1000
+
+
+# (signature index per folded category, P(misses all), summed P(holds),
+#  summed plogp, holds one for sure, summed envelope probability)
+_Partial = Tuple[Tuple[int, ...], List[float], List[float], List[float], List[bool], float]
+
+
+def _plogp(p: float) -> float:
+    return p * log(p) if p > 0.0 else 0.0
+
+
+class SuggestionPlanner:
+    def __init__(self, kb: KnowledgeBase):
+        self.kb = kb
+        self._fingerprint: Optional[int] = None
+        self._ranked: List[Tuple[float, float, Guess]] = []
+        self._best_fingerprint: Optional[int] = None
+        self._best: Optional[Guess] = None
+
+    def responders(self) -> List[str]:
+        """Players asked to refute, in order, when the KB owner suggests."""
+        players = self.kb.players
+        if self.kb.owner not in players:
+            return players[:]
+        idx = players.index(self.kb.owner)
+        return players[idx + 1:] + players[:idx]
+
+    def ranked(self) -> List[Tuple[float, float, Guess]]:
+        """(expected information, envelope score, guess) for every guess, best
+        first by information plus ENVELOPE_WEIGHT times envelope score; at most
+        MAX_COMBINATIONS of them.
+
+        Cached until the knowledge base fingerprint changes.
+        """
+        if self._fingerprint != self.kb.fingerprint or not self._ranked:
+            self._ranked = self._evaluate()
+            self._fingerprint = self.kb.fingerprint
+        return self._ranked
+
+    def best(self) -> Guess:
+        """ranked()[0]'s guess, found without scoring every guess."""
+        if self._ranked and self._fingerprint == self.kb.fingerprint:
+            return self._ranked[0][2]
+        if self._best_fingerprint != self.kb.fingerprint or self._best is None:
+            self._best = self._search()
+            self._best_fingerprint = self.kb.fingerprint
+        return self._best
+
+    def _signatures(self) -> Tuple[int, list, list, list, list]:
+        """Per category, its distinct (P(holds) per responder, P(envelope))
+        signatures; cards sharing one score identically, so only those are
+        scored. Returns (responder count, held, plogp, env, members), pruned."""
+        prob_matrix = self.kb.prob_matrix
+        # The envelope last, after one column per responder
+        columns = [prob_matrix[p] for p in self.responders()] + [self.kb.envelope_probs]
+        n = len(columns) - 1
+        held, plogp, env, members = [], [], [], []
+        for cat in self.kb.categories:
+            sigs: Dict[Tuple[float, ...], List[Card]] = {}
+            for c in self.kb.category_cards(cat):
+                ck = card_key(c)
+                sig = tuple([col[ck] for col in columns])
+                sigs.setdefault(sig, []).append(c)
+            held.append([sig[:n] for sig in sigs])
+            plogp.append([[_plogp(q) for q in sig[:n]] for sig in sigs])
+            env.append([sig[n] for sig in sigs])
+            members.append(list(sigs.values()))
+        self._prune(held, plogp, env, members)
+        return n, held, plogp, env, members
+
+    @staticmethod
+    def _partial(n: int, held: list, plogp: list, env: list,
+                 idx: Tuple[int, ...]) -> _Partial:
+        """Fold the signatures idx picks from every category but the last into
+        per-responder terms shared by every card of the last category."""
+        miss, total, pl, known, e = [1.0] * n, [0.0] * n, [0.0] * n, [False] * n, 0.0
+        for k, si in enumerate(idx):
+            h = held[k][si]
+            miss = [m * (1.0 - q) for m, q in zip(miss, h)]
+            total = [a + q for a, q in zip(total, h)]
+            pl = [a + b for a, b in zip(pl, plogp[k][si])]
+            known = [known_j or q >= 1.0 for known_j, q in zip(known, h)]
+            e += env[k][si]
+        return idx, miss, total, pl, known, e
+
+    @staticmethod
+    def _info(partial: _Partial, r_held: Tuple[float, ...],
+              r_plogp: List[float]) -> float:
+        """Expected information of a partial completed by one last-category signature."""
+        _, pair_miss, pair_sum, pair_plogp, pair_known, _ = partial
+        info = 0.0
+        reach = 1.0  # P(nobody before responder j refuted)
+        for j in range(len(r_held)):
+            q = r_held[j]
+            refute = reach * (1.0 - pair_miss[j] * (1.0 - q))
+            if refute > 0.0:
+                # Who refutes, then which card they show (~ P(holds card))
+                info -= refute * log(refute)
+                z = pair_sum[j] + q
+                if z > 0.0 and not (pair_known[j] or q >= 1.0):
+                    info += refute * (log(z) - (pair_plogp[j] + r_plogp[j]) / z)
+            reach -= refute
+            if reach <= 0.0:
+                break
+        return info - _plogp(reach)
+
+    def _evaluate(self) -> List[Tuple[float, float, Guess]]:
+        n, held, plogp, env, members = self._signatures()
+        last = len(held) - 1
+        scored = []
+        for idx in product(*(range(len(h)) for h in held[:last])):
+            partial = self._partial(n, held, plogp, env, idx)
+            pair_env = partial[5]
+            for ri, r_held in enumerate(held[last]):
+                info = self._info(partial, r_held, plogp[last][ri])
+                env_sum = pair_env + env[last][ri]
+                scored.append((info + ENVELOPE_WEIGHT * env_sum, info, env_sum,
+                               idx + (ri,)))
+        scored.sort(reverse=True)
+        guesses = ((info, env_sum, guess)
+                   for _, info, env_sum, idx in scored
+                   for guess in product(*(members[k][i] for k, i in enumerate(idx))))
+        return list(islice(guesses, MAX_COMBINATIONS))
+
+    def _search(self) -> Guess:
+        """The top guess of _evaluate, visiting guesses by envelope score and
+        stopping once even the most informative remaining one cannot win."""
+        n, held, plogp, env, members = self._signatures()
+        last = len(held) - 1
+        # The observation is who refutes and which of the guess's cards they
+        # show, so no guess can be worth more than log(outcomes) nats
+        bound = log(n * len(held) + 1) + 1e-9
+        heads = sorted(((sum(env[k][i] for k, i in enumerate(idx)), idx)
+                        for idx in product(*(range(len(h)) for h in held[:last]))),
+                       key=lambda head: -head[0])
+        order = sorted(range(len(held[last])), key=lambda ri: -env[last][ri])
+        top_env = env[last][order[0]]
+        best: Tuple[float, float, float, Tuple[int, ...]] = (float("-inf"), 0.0, 0.0, ())
+        for pair_env, idx in heads:
+            if ENVELOPE_WEIGHT * (pair_env + top_env) + bound < best[0]:
+                break
+            partial = self._partial(n, held, plogp, env, idx)
+            for ri in order:
+                env_sum = pair_env + env[last][ri]
+                if ENVELOPE_WEIGHT * env_sum + bound < best[0]:
+                    break
+                info = self._info(partial, held[last][ri], plogp[last][ri])
+                best = max(best, (info + ENVELOPE_WEIGHT * env_sum, info, env_sum,
+                                  idx + (ri,)))
+        return tuple(members[k][i][0] for k, i in enumerate(best[3]))
+
+    @staticmethod
+    def _prune(held: List[List[Tuple[float, ...]]], plogp: List[List[List[float]]],
+               env: List[List[float]], members: List[List[List[Card]]]) -> None:
+        """Cut each category's signatures so their product is at most
+        MAX_COMBINATIONS, keeping the likeliest and least-known cards."""
+        sizes = [len(h) for h in held]
+        combinations = 1
+        for size in sizes:
+            combinations *= size
+        if combinations <= MAX_COMBINATIONS:
+            return
+        # Split the budget evenly, smallest categories first, so a category
+        # needing less than its share passes the rest on
+        budget = float(MAX_COMBINATIONS)
+        keep = sizes[:]
+        order = sorted(range(len(sizes)), key=sizes.__getitem__)
+        for pos, k in enumerate(order):
+            share = int(budget ** (1.0 / (len(order) - pos)) + 1e-9)
+            keep[k] = max(1, min(sizes[k], share))
+            budget /= keep[k]
+        for k, limit in enumerate(keep):
+            if limit == sizes[k]:
+                continue
+            # Envelope chance plus how uncertain the holders are (plogp is -entropy)
+            priority = [ENVELOPE_WEIGHT * env[k][i] -
+                        sum(plogp[k][i]) - sum(_plogp(1.0 - q) for q in held[k][i])
+                        for i in range(sizes[k])]
+            kept = sorted(sorted(range(sizes[k]), key=lambda i: -priority[i])[:limit])
+            held[k] = [held[k][i] for i in kept]
+            plogp[k] = [plogp[k][i] for i in kept]
+            env[k] = [env[k][i] for i in kept]
+            members[k] = [members[k][i] for i in kept]
@@ -0,0 +1,134 @@
+"""Opt-in call counts and wall time for the engine and KB hot paths.
+
+    from logic import profiling
+    profiling.enable()
+    ...play...
+    print(profiling.format_report(profiling.stats()))
+
+enable() swaps timing wrappers onto the methods in HOT_PATHS and disable()
+puts the originals back, so nothing is paid while profiling is off. Times
+are inclusive: a method's total includes whatever it calls, and a re-entrant
+call is counted but not timed twice.
+"""
+import functools
+import json
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from logic.game_engine import GameEngine
+from logic.knowledge_base import KnowledgeBase
+from models.player import AIPlayer
+
+# (class, method name) pairs instrumented by enable()
+HOT_PATHS: Tuple[Tuple[type, str], ...] = (
+    (KnowledgeBase, "_propagate"),
+    (KnowledgeBase, "update_probabilities"),
+    (KnowledgeBase, "note_has_card"),
+    (KnowledgeBase, "note_cannot_have_any"),
+    (KnowledgeBase, "note_has_one_of"),
+    # The batched form of the note_* calls, used for whole suggestions
+    (KnowledgeBase, "apply_events"),
+    (AIPlayer, "decide_suggestion"),
+    (AIPlayer, "decide_accusation"),
+    (GameEngine, "take_ai_turn"),
+    # Every blocking suggestion, human or AI; the async drivers are not timed
+    (GameEngine, "handle_suggestion"),
+)
+
+# Report per name: {"calls": int, "total_sec": float}
+Stats = Dict[str, Dict[str, float]]
+
+
+class _Counter:
+    __slots__ = ("calls", "seconds", "depth")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.depth = 0
+
+
+_counters: Dict[str, _Counter] = {}
+_originals: Dict[Tuple[type, str], Callable] = {}
+
+
+def _timed(name: str, fn: Callable) -> Callable:
+    counter = _counters.setdefault(name, _Counter())
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        counter.calls += 1
+        if counter.depth:
+            return fn(*args, **kwargs)
+        counter.depth = 1
+        start = perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            counter.seconds += perf_counter() - start
+            counter.depth = 0
+    return wrapper
+
+
+def enabled() -> bool:
+    return bool(_originals)
+
+
+def enable() -> None:
+    """Start recording; counters keep whatever they already hold."""
+    for cls, attr in HOT_PATHS:
+        if (cls, attr) in _originals:
+            continue
+        fn = cls.__dict__[attr]
+        _originals[(cls, attr)] = fn
+        setattr(cls, attr, _timed(f"{cls.__name__}.{attr}", fn))
+
+
+def disable() -> None:
+    """Stop recording and restore the plain methods; counters are kept."""
+    for (cls, attr), fn in _originals.items():
+        setattr(cls, attr, fn)
+    _originals.clear()
+
+
+def reset() -> None:
+    for counter in _counters.values():
+        counter.calls = 0
+        counter.seconds = 0.0
+
+
+def stats() -> Stats:
+    """Counts and times recorded since the last reset()."""
+    return {name: {"calls": c.calls, "total_sec": c.seconds}
+            for name, c in _counters.items() if c.calls}
+
+
+def merge(reports: List[Stats]) -> Stats:
+    """Sum several reports, e.g. one per game of a batch."""
+    total: Stats = {}
+    for report in reports:
+        for name, entry in report.items():
+            acc = total.setdefault(name, {"calls": 0, "total_sec": 0.0})
+            acc["calls"] += entry["calls"]
+            acc["total_sec"] += entry["total_sec"]
+    return total
+
+
+def format_report(report: Stats, games: Optional[int] = None) -> str:
+    """Table of the report, slowest total first; per-game columns if games is given."""
+    header = f"{'method':34} {'calls':>10} {'total s':>9} {'mean us':>9}"
+    if games:
+        header += f" {'calls/game':>11} {'ms/game':>8}"
+    lines = [header]
+    for name, e in sorted(report.items(), key=lambda kv: -kv[1]["total_sec"]):
+        calls, total = int(e["calls"]), e["total_sec"]
+        line = f"{name:34} {calls:10d} {total:9.3f} {total / calls * 1e6:9.1f}"
+        if games:
+            line += f" {calls / games:11.1f} {total / games * 1e3:8.2f}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def dump_json(report: Stats, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
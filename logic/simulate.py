@@ -0,0 +1,217 @@
+"""Headless all-AI game simulator.
+
+Plays games through GameEngine.take_ai_turn / next_turn without any UI and
+reports aggregate statistics:
+
+    python -m logic.simulate --games 100000 --players 6 --jobs 8
+
+Game i of a batch is seeded with derive_seed(base, "game", i), so a batch
+with the same --seed gives the same results however it is split across
+processes, and one game can be replayed alone with --seed and --game.
+--profile adds call counts and wall time for the engine and knowledge-base
+hot paths (see logic.profiling).
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from logic import profiling
+from logic.game_engine import GameEngine
+from logic.seeding import derive_seed, new_seed
+from models.cards import REGISTRY, CardRegistry, load_deck
+from models.player import AIPlayer
+
+
+@dataclass
+class GameResult:
+    winner_seat: Optional[int]
+    turns: int
+    wrong_accusations: int
+    # True when the winner accused correctly (not last one standing / turn cap)
+    solved: bool
+    # AI decision-cache lookups over the game, summed across players
+    cache_hits: int = 0
+    cache_misses: int = 0
+    # The game's seed: GameEngine(seed=...) replays it
+    seed: Optional[int] = None
+    # Hot-path counts and times (see logic.profiling) when profiling is on
+    profile: Optional[Dict[str, Dict[str, float]]] = None
+
+
+def play_game(players: int, max_turns: int = 1000, exact: bool = False,
+              seed: Optional[int] = None,
+              registry: CardRegistry = REGISTRY) -> GameResult:
+    if profiling.enabled():
+        profiling.reset()
+    engine = GameEngine(human_name=None, ai_count=players, exact_inference=exact,
+                        registry=registry, seed=seed)
+    turns = 0
+    while not engine.game_over and turns < max_turns:
+        ai: AIPlayer = engine.current_player  # type: ignore[assignment]
+        engine.take_ai_turn(ai)
+        turns += 1
+        if not engine.game_over:
+            engine.next_turn()
+
+    wrong = sum(1 for p in engine.players if not p.is_active)
+    seat = next((i for i, p in enumerate(engine.players)
+                 if p.name == engine.winner), None)
+    solved = seat is not None and wrong < players - 1
+    hits = sum(p.decisions.hits for p in engine.players if isinstance(p, AIPlayer))
+    misses = sum(p.decisions.misses for p in engine.players
+                 if isinstance(p, AIPlayer))
+    return GameResult(seat, turns, wrong, solved, hits, misses, engine.seed,
+                      profiling.stats() if profiling.enabled() else None)
+
+
+def game_seed(base: int, index: int) -> int:
+    """Seed of game `index` in a batch with base seed `base`."""
+    return derive_seed(base, "game", index)
+
+
+def _play_batch(players: int, base: int, start: int, games: int, max_turns: int,
+                exact: bool = False, profile: bool = False,
+                registry: CardRegistry = REGISTRY) -> List[GameResult]:
+    if profile:
+        profiling.enable()
+    return [play_game(players, max_turns, exact, game_seed(base, i), registry)
+            for i in range(start, start + games)]
+
+
+def run(games: int, players: int, jobs: int = 1, max_turns: int = 1000,
+        chunk: int = 250, exact: bool = False, seed: Optional[int] = None,
+        profile: bool = False, registry: CardRegistry = REGISTRY) -> List[GameResult]:
+    """Play `games` all-AI games, fanned out over `jobs` processes.
+
+    Results come back in game order and depend only on `seed` (drawn at
+    random when None), not on `jobs` or `chunk`. With `profile`, each
+    result carries that game's logic.profiling report.
+    """
+    base = new_seed() if seed is None else seed
+    if jobs <= 1:
+        return _play_batch(players, base, 0, games, max_turns, exact, profile,
+                           registry)
+
+    starts = range(0, games, chunk)
+    results: List[GameResult] = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(_play_batch, players, base, start,
+                               min(chunk, games - start), max_turns, exact,
+                               profile, registry)
+                   for start in starts]
+        for f in futures:
+            results.extend(f.result())
+    return results
+
+
+def summarize(results: List[GameResult], players: int, elapsed: float,
+              seed: Optional[int] = None) -> Dict:
+    games = len(results)
+    finished = [r for r in results if r.winner_seat is not None]
+    solved = [r for r in results if r.solved]
+    wins = [0] * players
+    for r in finished:
+        wins[r.winner_seat] += 1  # type: ignore[index]
+    accusations = sum(r.wrong_accusations for r in results) + len(solved)
+    hits = sum(r.cache_hits for r in results)
+    lookups = hits + sum(r.cache_misses for r in results)
+    stats = {
+        "games": games,
+        "players": players,
+        "seed": seed,
+        "unfinished": games - len(finished),
+        "win_rate_by_seat": [w / games for w in wins] if games else [],
+        "solve_rate": len(solved) / games if games else 0.0,
+        "mean_turns_to_solve": (sum(r.turns for r in solved) / len(solved)
+                                if solved else None),
+        "wrong_accusation_rate": (sum(r.wrong_accusations for r in results) / accusations
+                                  if accusations else 0.0),
+        "decision_cache_hit_rate": hits / lookups if lookups else 0.0,
+        "elapsed_sec": elapsed,
+        "games_per_sec": games / elapsed if elapsed > 0 else None,
+    }
+    profiles = [r.profile for r in results if r.profile is not None]
+    if profiles:
+        stats["profile"] = profiling.merge(profiles)
+    return stats
+
+
+def format_report(stats: Dict) -> str:
+    lines = [
+        f"Games:                 {stats['games']} ({stats['players']} players, "
+        f"{stats['unfinished']} unfinished)",
+    ]
+    if stats.get("seed") is not None:
+        lines.append(f"Seed:                  {stats['seed']}")
+    lines += [
+        "Win rate by seat:      " +
+        "  ".join(f"{i}: {w:.1%}" for i,
+                  w in enumerate(stats["win_rate_by_seat"])),
+        f"Solved by accusation:  {stats['solve_rate']:.1%}",
+    ]
+    if stats["mean_turns_to_solve"] is not None:
+        lines.append(
+            f"Mean turns to solve:   {stats['mean_turns_to_solve']:.1f}")
+    lines.append(f"Wrong accusation rate: {stats['wrong_accusation_rate']:.1%}")
+    lines.append(
+        f"Decision cache hits:   {stats['decision_cache_hit_rate']:.1%}")
+    if stats["games_per_sec"] is not None:
+        lines.append(
+            f"Throughput:            {stats['games_per_sec']:.1f} games/sec "
+            f"({stats['elapsed_sec']:.2f}s)")
+    if stats.get("profile"):
+        lines += ["", profiling.format_report(stats["profile"], stats["games"])]
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--players", type=int, default=3,
+                        help="number of AI players per game")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (1 = run in-process)")
+    parser.add_argument("--max-turns", type=int, default=1000,
+                        help="abandon a game after this many turns")
+    parser.add_argument("--chunk", type=int, default=250,
+                        help="games per worker task")
+    parser.add_argument("--exact", action="store_true",
+                        help="AI players use exact deal-counting probabilities")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="base seed of the batch (default: random, and reported)")
+    parser.add_argument("--game", type=int, default=None, metavar="INDEX",
+                        help="replay only game INDEX of the batch given by --seed")
+    parser.add_argument("--json", action="store_true",
+                        help="print the statistics as JSON")
+    parser.add_argument("--profile", action="store_true",
+                        help="count and time the engine and KB hot paths")
+    parser.add_argument("--deck", default=None, metavar="PATH",
+                        help="play with the deck defined in this .json/.toml file")
+    args = parser.parse_args(argv)
+    registry = load_deck(args.deck) if args.deck else REGISTRY
+
+    if args.game is not None:
+        if args.seed is None:
+            parser.error("--game needs --seed")
+        if args.profile:
+            profiling.enable()
+        result = play_game(args.players, args.max_turns, args.exact,
+                           game_seed(args.seed, args.game), registry)
+        print(json.dumps(asdict(result), indent=2))
+        return
+
+    seed = new_seed() if args.seed is None else args.seed
+    start = time.perf_counter()
+    results = run(args.games, args.players, args.jobs,
+                  args.max_turns, args.chunk, args.exact, seed, args.profile,
+                  registry)
+    stats = summarize(results, args.players, time.perf_counter() - start, seed)
+    print(json.dumps(stats, indent=2) if args.json else format_report(stats))
+
+
+if __name__ == "__main__":
+    main()
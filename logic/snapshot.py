@@ -0,0 +1,390 @@
+"""Compact binary save/resume of a whole game, AI knowledge included.
+
+Cards are stored by registry id and knowledge as per-holder bitmasks, all
+little-endian; see _write_engine for the layout. The deck itself is not
+stored: loading takes the registry the game was played with (the classic
+deck by default) and checks the header, that the registry matches, and that
+the game state is self-consistent, raising SnapshotError otherwise.
+
+    data = snapshot.dumps(engine)
+    copies = [snapshot.loads(data) for _ in range(1000)]  # fork a position
+"""
+import random
+import struct
+import sys
+import zlib
+from array import array
+from typing import BinaryIO, List, Optional, Tuple, Union, get_args
+
+from logic.game_engine import GameEngine
+from logic.game_log import GameLog, LogEntry, LogEvent
+from logic.knowledge_base import KnowledgeState
+from logic.seeding import make_rng
+from logic.strategies import get_strategy
+from models.cards import REGISTRY, Card, CardRegistry
+from models.player import AIPlayer, Player
+
+MAGIC = b"CLUESNAP"
+# 2: adds the game seed and the engine's and every player's RNG state
+# 3: adds each AI's strategy name
+# 4: player, AI and hand-size counts, seat numbers and clause holders widen
+#    from one byte to two, for large decks
+VERSION = 4
+SUPPORTED_VERSIONS = (1, 2, 3, 4)
+
+_EVENTS: Tuple[LogEvent, ...] = get_args(LogEvent)
+_NONE_STR = 0xFFFF
+
+
+class SnapshotError(ValueError):
+    """The data is not a usable snapshot for this build."""
+
+
+def _registry_checksum(registry: CardRegistry) -> int:
+    return zlib.crc32("\n".join(c.key for c in registry.cards).encode())
+
+
+class _Writer:
+    def __init__(self):
+        self.buf = bytearray()
+
+    def pack(self, fmt: str, *values) -> None:
+        self.buf += struct.pack("<" + fmt, *values)
+
+    def str(self, s: Optional[str]) -> None:
+        if s is None:
+            self.pack("H", _NONE_STR)
+            return
+        raw = s.encode()
+        if len(raw) >= _NONE_STR:
+            raise SnapshotError("string too long for a snapshot")
+        self.pack("H", len(raw))
+        self.buf += raw
+
+    def mask(self, m: int) -> None:
+        raw = m.to_bytes((m.bit_length() + 7) // 8, "little")
+        self.pack("H", len(raw))
+        self.buf += raw
+
+    def ids(self, cards: List[Card]) -> None:
+        self.pack("H", len(cards))
+        self.pack(f"{len(cards)}H", *(c.id for c in cards))
+
+    def doubles(self, values: array) -> None:
+        if sys.byteorder == "big":
+            values = array("d", values)
+            values.byteswap()
+        self.pack("I", len(values))
+        self.buf += values.tobytes()
+
+    def rng(self, rng: random.Random) -> None:
+        version, words, gauss = rng.getstate()
+        self.pack("BH", version, len(words))
+        self.pack(f"{len(words)}I", *words)
+        self.pack("?d", gauss is not None, gauss or 0.0)
+
+
+class _Reader:
+    def __init__(self, data: bytes, registry: CardRegistry):
+        self.data = memoryview(data)
+        self.pos = 0
+        self.registry = registry
+        # struct code of counts and seat numbers: "B" before version 4
+        self.count = "H"
+
+    def take(self, n: int) -> memoryview:
+        if self.pos + n > len(self.data):
+            raise SnapshotError("snapshot is truncated")
+        chunk = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return chunk
+
+    def unpack(self, fmt: str) -> tuple:
+        fmt = "<" + fmt
+        return struct.unpack(fmt, self.take(struct.calcsize(fmt)))
+
+    def one(self, fmt: str):
+        return self.unpack(fmt)[0]
+
+    def str(self) -> Optional[str]:
+        n = self.one("H")
+        if n == _NONE_STR:
+            return None
+        try:
+            return str(self.take(n), "utf-8")
+        except UnicodeDecodeError:
+            raise SnapshotError("snapshot holds invalid text") from None
+
+    def name(self) -> str:
+        s = self.str()
+        if s is None:
+            raise SnapshotError("missing name in snapshot")
+        return s
+
+    def mask(self) -> int:
+        return int.from_bytes(self.take(self.one("H")), "little")
+
+    def ids(self) -> List[Card]:
+        n = self.one("H")
+        ids = self.unpack(f"{n}H")
+        cards = self.registry.cards
+        if any(i >= len(cards) for i in ids):
+            raise SnapshotError("unknown card id in snapshot")
+        return [cards[i] for i in ids]
+
+    def doubles(self) -> array:
+        values = array("d")
+        values.frombytes(self.take(8 * self.one("I")))
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+
+    def rng(self) -> random.Random:
+        version, n = self.unpack("BH")
+        words = self.unpack(f"{n}I")
+        has_gauss, gauss = self.unpack("?d")
+        rng = random.Random()
+        try:
+            rng.setstate((version, words, gauss if has_gauss else None))
+        except (TypeError, ValueError):
+            raise SnapshotError("snapshot holds an invalid RNG state") from None
+        return rng
+
+
+def _check(ok: bool, what: str) -> None:
+    if not ok:
+        raise SnapshotError(f"inconsistent snapshot: {what}")
+
+
+def _write_engine(w: _Writer, engine: GameEngine) -> None:
+    if engine.pending_request is not None:
+        # A suspended suggestion lives in a generator and cannot be saved
+        raise SnapshotError("cannot save a game waiting for a card to be shown")
+    # Header: magic, format version, card count and registry checksum
+    w.buf += MAGIC
+    w.pack("HHI", VERSION, len(engine.registry.cards),
+           _registry_checksum(engine.registry))
+
+    # Game: setup options, flags, turn, solution and undealt cards
+    w.str(engine.human_name)
+    w.pack("H?", engine.ai_count, engine.exact_inference)
+    w.pack("??", engine.suggested_this_turn, engine.game_over)
+    w.str(engine.winner)
+    w.pack("HI", engine.turn_index, engine.turn_count)
+    w.ids(list(engine.solution))
+    w.ids(engine.deck)
+    w.pack("Q", engine.seed)
+    w.rng(engine.rng)
+
+    # Players: name, flags, hand in order, then AI memory and knowledge
+    w.pack("H", len(engine.players))
+    for p in engine.players:
+        w.str(p.name)
+        w.pack("???", p.is_human, p.is_active, isinstance(p, AIPlayer))
+        w.ids(p.hand)
+        w.rng(p.rng)
+        if isinstance(p, AIPlayer):
+            w.str(p.strategy.name)
+            probe = p.last_unrefuted_suggestion
+            w.pack("?", probe is not None)
+            if probe is not None:
+                w.str(probe[0])
+                w.ids(list(probe[1]))
+            _write_knowledge(w, p.kb.state())
+
+    # Log: buffer size, newest sequence number, then the buffered entries
+    w.pack("III", engine.logs.maxlen, engine.logs.last_seq, len(engine.logs))
+    for e in engine.logs:
+        w.pack("IIB", e.seq, e.turn, _EVENTS.index(e.event))
+        w.str(e.actor)
+        w.str(e.text)
+
+
+def _write_knowledge(w: _Writer, st: KnowledgeState) -> None:
+    w.str(st.owner)
+    w.pack("?H", st.exact, len(st.players))
+    for name in st.players:
+        w.str(name)
+    w.pack("?", st.hand_sizes is not None)
+    if st.hand_sizes is not None:
+        w.pack(f"{len(st.hand_sizes)}H", *st.hand_sizes)
+    w.pack("H", len(st.has))
+    for has, has_not in zip(st.has, st.has_not):
+        w.mask(has)
+        w.mask(has_not)
+    w.pack("I", len(st.clauses))
+    for h, mask in st.clauses:
+        w.pack("H", h)
+        w.mask(mask)
+    w.mask(st.refuted)
+    for values in (st.prob, st.bias, st.envelope, st.raw_envelope):
+        w.doubles(values)
+    w.mask(st.prob_dirty)
+    w.pack("?QIII", st.exact_probabilities, st.fingerprint, st.revision,
+           st.prob_invalidations, st.prob_recomputes)
+
+
+def _read_knowledge(r: _Reader, owner: str) -> KnowledgeState:
+    kb_owner = r.name()
+    exact, n_players = r.unpack("?" + r.count)
+    players = [r.name() for _ in range(n_players)]
+    hand_sizes = list(r.unpack(f"{n_players}{r.count}")) if r.one("?") else None
+    n_holders = r.one(r.count)
+    _check(kb_owner == owner, f"knowledge of {owner} belongs to {kb_owner}")
+    _check(n_holders == n_players + 1, f"{owner} has the wrong holder count")
+    has, has_not = [], []
+    for _ in range(n_holders):
+        has.append(r.mask())
+        has_not.append(r.mask())
+    clauses = []
+    for _ in range(r.one("I")):
+        h = r.one(r.count)
+        clauses.append((h, r.mask()))
+    refuted = r.mask()
+    prob, bias, envelope, raw_envelope = (r.doubles() for _ in range(4))
+    prob_dirty = r.mask()
+    exact_probabilities, fingerprint, revision, invalidations, recomputes = \
+        r.unpack("?QIII")
+
+    n_cards = len(r.registry.cards)
+    every = (1 << n_cards) - 1
+    _check(all(not (a & b) for a, b in zip(has, has_not)),
+           f"{owner} both knows and rules out a card")
+    _check(all(not m & ~every for m in has + has_not + [refuted, prob_dirty]),
+           f"{owner} refers to cards outside the deck")
+    _check(all(h < n_players and not mask & ~every for h, mask in clauses),
+           f"{owner} has an invalid clause")
+    _check(len(prob) == len(bias) == n_cards * n_players
+           and len(envelope) == len(raw_envelope) == n_cards,
+           f"{owner} has probability tables of the wrong size")
+    return KnowledgeState(kb_owner, exact, players, hand_sizes, has, has_not,
+                          clauses, refuted, prob, bias, envelope, raw_envelope,
+                          prob_dirty, exact_probabilities, fingerprint, revision,
+                          invalidations, recomputes)
+
+
+def _read_engine(r: _Reader) -> GameEngine:
+    if bytes(r.take(len(MAGIC))) != MAGIC:
+        raise SnapshotError("not a game snapshot")
+    version, n_cards, checksum = r.unpack("HHI")
+    if version not in SUPPORTED_VERSIONS:
+        raise SnapshotError(f"unsupported snapshot version {version}")
+    registry = r.registry
+    if n_cards != len(registry.cards) or checksum != _registry_checksum(registry):
+        raise SnapshotError("snapshot was saved with a different deck")
+
+    human_name = r.str()
+    if version < 4:
+        r.count = "B"
+    ai_count, exact_inference = r.unpack(r.count + "?")
+    suggested_this_turn, game_over = r.unpack("??")
+    winner = r.str()
+    turn_index, turn_count = r.unpack(r.count + "I")
+    solution = r.ids()
+    deck = r.ids()
+    # Version 1 predates seeding: the resumed game gets fresh random streams
+    seed = r.one("Q") if version >= 2 else None
+
+    engine = GameEngine(human_name=human_name, ai_count=ai_count,
+                        exact_inference=exact_inference, registry=registry,
+                        auto_setup=False, seed=seed)
+    if version >= 2:
+        engine.rng = r.rng()
+    players: List[Player] = []
+    states: List[Tuple[AIPlayer, KnowledgeState]] = []
+    n_players = r.one(r.count)
+    names: List[str] = []
+    for _ in range(n_players):
+        names.append(r.name())
+        is_human, is_active, is_ai = r.unpack("???")
+        p: Player = AIPlayer(names[-1]) if is_ai else Player(names[-1], is_human)
+        p.is_active = is_active
+        p.receive_cards(r.ids())
+        p.rng = r.rng() if version >= 2 else \
+            make_rng(engine.seed, "player", len(players))
+        players.append(p)
+        if isinstance(p, AIPlayer):
+            if version >= 3:
+                try:
+                    p.strategy = get_strategy(r.name())
+                except ValueError as exc:
+                    raise SnapshotError(str(exc)) from None
+            if r.one("?"):
+                suggester = r.name()
+                probe = r.ids()
+                _check(len(probe) == len(registry.categories),
+                       "probe is not one card per category")
+                p.last_unrefuted_suggestion = (suggester, tuple(probe))
+            states.append((p, _read_knowledge(r, p.name)))
+
+    maxlen, last_seq, n_entries = r.unpack("III")
+    entries = []
+    for _ in range(n_entries):
+        seq, turn, event = r.unpack("IIB")
+        _check(event < len(_EVENTS), "unknown log event")
+        entries.append(LogEntry(seq, turn, r.str(), _EVENTS[event], r.name()))
+    if r.pos != len(r.data):
+        raise SnapshotError("trailing bytes after snapshot")
+
+    # Whole-game consistency
+    _check(len(set(names)) == len(names), "duplicate player names")
+    _check(tuple(c.type for c in solution) == registry.categories,
+           "solution is not one card per category")
+    dealt = [c for p in players for c in p.hand] + solution + deck
+    _check(len(dealt) == len(set(dealt)) == len(registry.cards),
+           "cards are missing or dealt twice")
+    _check(turn_index < len(players), "turn index out of range")
+    _check(winner is None or winner in names, "winner is not a player")
+    _check(all(e.seq <= last_seq for e in entries), "log sequence out of order")
+    _check(all(st.players == names for _, st in states),
+           "an AI knows a different table")
+
+    engine.players = players
+    engine.solution = tuple(solution)
+    engine.deck = deck
+    engine.turn_index, engine.turn_count = turn_index, turn_count
+    engine.suggested_this_turn, engine.game_over = suggested_this_turn, game_over
+    engine.winner = winner
+    engine.logs = GameLog(maxlen)
+    engine.logs.restore(entries, last_seq)
+    for ai, state in states:
+        ai.kb.restore(state, list(registry.cards))
+    return engine
+
+
+def dumps(engine: GameEngine) -> bytes:
+    w = _Writer()
+    try:
+        _write_engine(w, engine)
+    except struct.error as exc:
+        raise SnapshotError(f"game is too large to save: {exc}") from None
+    return bytes(w.buf)
+
+
+def loads(data: bytes, registry: CardRegistry = REGISTRY) -> GameEngine:
+    """Rebuild a game from dumps() output; the human responder and log sink are
+    not attached.
+
+    registry must be the deck the game was saved with.
+    """
+    return _read_engine(_Reader(data, registry))
+
+
+def save(engine: GameEngine, file: Union[str, BinaryIO]) -> None:
+    if isinstance(file, str):
+        with open(file, "wb") as f:
+            f.write(dumps(engine))
+    else:
+        file.write(dumps(engine))
+
+
+def load(file: Union[str, BinaryIO], registry: CardRegistry = REGISTRY) -> GameEngine:
+    if isinstance(file, str):
+        with open(file, "rb") as f:
+            return loads(f.read(), registry)
+    return loads(file.read(), registry)
+
+
+def fork(engine: GameEngine) -> GameEngine:
+    """Independent copy of a game in progress."""
+    return loads(dumps(engine), engine.registry)
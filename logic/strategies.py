@@ -0,0 +1,201 @@
+"""Pluggable AI policies.
+
+A Strategy bundles three decisions: which suggestion to make, whether (and
+what) to accuse, and which card to show when refuting. AIPlayer asks its
+strategy for each; the knowledge base and planner stay with the player, so
+policies only read them. Strategies are registered by name in STRATEGIES,
+which is how games, snapshots and tournaments refer to them.
+"""
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from logic.knowledge_base import ENVELOPE
+from logic.planner import Guess
+from models.cards import Card, CardType, card_key
+
+if TYPE_CHECKING:
+    from models.player import AIPlayer, Player
+
+SuggestionPolicy = Callable[["AIPlayer"], Guess]
+AccusationPolicy = Callable[["AIPlayer"], Optional[Guess]]
+# (player, cards they could show, suggester) -> card to show
+ShowPolicy = Callable[["Player", List[Card], str], Card]
+
+
+@dataclass(frozen=True)
+class Strategy:
+    name: str
+    suggest: SuggestionPolicy
+    accuse: AccusationPolicy
+    show_card: ShowPolicy
+
+
+# --- Suggestion policies ---
+
+def suggest_by_planner(ai: "AIPlayer") -> Guess:
+    """Confirm a unique solution guess; otherwise the planner's best guess."""
+    maybe_solution = ai.kb.current_solution_guess()
+    if maybe_solution:
+        return maybe_solution
+    return ai.planner.best()
+
+
+def suggest_by_card_scores(ai: "AIPlayer") -> Guess:
+    """Pick each category's card independently by envelope probability plus a
+    fading bonus for cards whose holder is still unknown."""
+    maybe_solution = ai.kb.current_solution_guess()
+    if maybe_solution:
+        return maybe_solution
+
+    # Dynamic exploration → exploitation based on progress
+    total_cards = len(ai.kb.cards)
+    seen_cards = len(ai.kb.refuted_cards)
+    progress_ratio = seen_cards / total_cards if total_cards else 0.0
+    info_weight = max(0.0, 0.5 * (1.0 - progress_ratio))
+
+    envelope_probs = ai.kb.envelope_probs
+    guess: List[Card] = []
+    for cat in ai.kb.categories:
+        def score(card: Card) -> float:
+            unknown_holders = sum(
+                1 for p in ai.kb.players
+                if ai.kb.is_known_to_player(p, card) is None
+            )
+            info_gain = (unknown_holders / len(ai.kb.players)
+                         ) if ai.kb.players else 0.0
+            return envelope_probs[card_key(card)] + info_weight * info_gain
+
+        guess.append(max(ai.kb.category_cards(cat), key=score))
+    return tuple(guess)
+
+
+# --- Accusation policies ---
+
+def accuse_when_certain(ai: "AIPlayer") -> Optional[Guess]:
+    """Accuse only once the solution is logically determined."""
+    return ai.kb.confirmed_solution() or ai.kb.current_solution_guess()
+
+
+def accuse_by_thresholds(ai: "AIPlayer") -> Optional[Guess]:
+    """Accuse when certain, or when the envelope probabilities clear
+    thresholds that tighten as the game progresses."""
+    # 1) Absolute certainty
+    confirmed = ai.kb.confirmed_solution()
+    if confirmed:
+        return confirmed
+
+    # 2) Unique candidate per category
+    unique_guess = ai.kb.current_solution_guess()
+    if unique_guess:
+        return unique_guess
+
+    envelope_probs = ai.kb.envelope_probs
+    categories = ai.kb.categories
+
+    # 3) Exact probabilities: accuse once the envelope is (near) certain
+    if ai.kb.probabilities_exact:
+        best = [max(ai.kb.category_cards(cat), key=lambda c: envelope_probs[card_key(c)])
+                for cat in categories]
+        risk = sum(1.0 - envelope_probs[card_key(c)] for c in best)
+        if risk <= ai.EXACT_ACCUSE_RISK:
+            return tuple(best)
+        return None
+
+    # 4) Confidence-based accusation off normalized category probabilities
+    def top_two(cat: CardType):
+        items = [
+            (c, envelope_probs[card_key(c)])
+            for c in ai.kb.category_cards(cat)
+            if ai.kb.is_known_to_player(ENVELOPE, c) is not False
+        ]
+        items.sort(key=lambda x: x[1], reverse=True)
+        top_card, p1 = items[0]
+        p2 = items[1][1] if len(items) > 1 else 0.0
+        return top_card, p1, p2
+
+    # (top card, its probability, runner-up probability) per category
+    tops = [top_two(cat) for cat in categories]
+    guess = tuple(card for card, _, _ in tops)
+
+    # Progress: how much envelope space is eliminated
+    total_env_slots = sum(len(ai.kb.category_cards(cat)) for cat in categories)
+    eliminated = sum(
+        1 for cat in categories for c in ai.kb.category_cards(cat)
+        if ai.kb.is_known_to_player(ENVELOPE, c) is False
+    )
+    progress = eliminated / total_env_slots if total_env_slots else 0.0
+
+    # Dynamic thresholds: cautious early, assertive late
+    per_cat_min = 0.50 + 0.25 * progress       # 0.50 → 0.75
+    margin_min = 0.05 + 0.15 * progress        # 0.05 → 0.20
+    product_min = 0.20 + 0.30 * progress       # 0.20 → 0.50
+
+    # Bold risk shortcuts
+    RISK_ACCUSATION_THRESHOLD = 0.85
+    BIG_MARGIN = 0.40
+
+    # Shortcut 1: Very high confidence in each category
+    if all(p1 >= RISK_ACCUSATION_THRESHOLD for _, p1, _ in tops):
+        return guess
+
+    # Shortcut 2: Huge margin + reasonably high confidence
+    if all((p1 - p2) >= BIG_MARGIN and p1 >= 0.75 for _, p1, p2 in tops):
+        return guess
+
+    # Standard dynamic threshold checks
+    if not all(p1 >= per_cat_min for _, p1, _ in tops):
+        return None
+    if not all((p1 - p2) >= margin_min for _, p1, p2 in tops):
+        return None
+
+    product_conf = 1.0
+    for _, p1, _ in tops:
+        product_conf *= p1
+    if product_conf < product_min:
+        return None
+
+    return guess
+
+
+# --- Card-showing policies ---
+
+def show_known_first(player: "Player", matches: List[Card], suggester: str) -> Card:
+    """Prefer a card the suggester already knows, then one shown before."""
+    kb = getattr(player, "kb", None)
+    # 1. Prefer to show a card already known to the suggester
+    known_cards = [c for c in matches if kb and kb.is_known_to_player(suggester, c)]
+    if known_cards:
+        return player.rng.choice(known_cards)
+
+    # 2. If none known, pick one that’s already been refuted before
+    refuted_cards = [c for c in matches if kb and kb.has_been_refuted_before(c)]
+    if refuted_cards:
+        return player.rng.choice(refuted_cards)
+
+    # 3. Otherwise, pick at random
+    return player.rng.choice(matches)
+
+
+def show_random(player: "Player", matches: List[Card], suggester: str) -> Card:
+    return player.rng.choice(matches)
+
+
+STRATEGIES: Dict[str, Strategy] = {s.name: s for s in (
+    # The default: expected-information planner with threshold accusations
+    Strategy("planner", suggest_by_planner, accuse_by_thresholds, show_known_first),
+    # Per-card scoring, as before the planner existed
+    Strategy("classic", suggest_by_card_scores, accuse_by_thresholds, show_known_first),
+    # Planner suggestions, but never accuses on probabilities alone
+    Strategy("cautious", suggest_by_planner, accuse_when_certain, show_known_first),
+    # Planner and thresholds, showing cards without regard to what is known
+    Strategy("random-show", suggest_by_planner, accuse_by_thresholds, show_random),
+)}
+DEFAULT_STRATEGY = STRATEGIES["planner"]
+
+
+def get_strategy(name: str) -> Strategy:
+    try:
+        return STRATEGIES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown strategy {name!r}; choose from {', '.join(STRATEGIES)}") from None
@@ -0,0 +1,233 @@
+"""Round-robin tournaments between AI strategies.
+
+    python -m logic.tournament --strategies planner classic cautious --players 4
+
+Every pair of strategies plays a matchup of all-AI games. The two share
+each table in alternating seats, and games come in blocks that rotate the
+seating through every offset with both assignments of who sits first, so
+neither strategy gets a seat advantage. After each block the Wilson
+interval of the first strategy's share of the pair's wins is checked, and
+the matchup stops once its half-width is within --precision (or after
+--max-games). Blocks are spread over a process pool; results are consumed
+in block order, so a given --seed gives the same outcome for any --jobs.
+"""
+import argparse
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from itertools import combinations
+from math import sqrt
+from typing import Dict, List, Optional, Tuple
+
+from logic.game_engine import GameEngine
+from logic.seeding import derive_seed, new_seed
+from logic.strategies import STRATEGIES, get_strategy
+from models.cards import REGISTRY, CardRegistry, load_deck
+
+# z for a 95% confidence interval
+Z95 = 1.959964
+
+
+def wilson_interval(wins: int, n: int, z: float = Z95) -> Tuple[float, float]:
+    """Wilson score interval for a win rate of wins / n."""
+    if n == 0:
+        return 0.0, 1.0
+    p = wins / n
+    denom = 1.0 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * sqrt(p * (1.0 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+@dataclass
+class MatchupResult:
+    a: str
+    b: str
+    games: int
+    a_wins: int
+    b_wins: int
+    # Games that hit the turn cap without a winner
+    unfinished: int
+    # a's share of the games either strategy won, with its 95% interval
+    a_share: float
+    ci_low: float
+    ci_high: float
+    # True when the interval got tight enough before max_games
+    converged: bool
+
+
+def seating(players: int, a: str, b: str, k: int) -> List[str]:
+    """Strategy per seat for game k of a block of 2 * players games."""
+    first, second = (a, b) if k < players else (b, a)
+    base = [first if i % 2 == 0 else second for i in range(players)]
+    shift = k % players
+    return base[shift:] + base[:shift]
+
+
+def play_block(players: int, a: str, b: str, seed: int, block: int,
+               max_turns: int = 1000,
+               registry: CardRegistry = REGISTRY) -> List[Optional[str]]:
+    """Play one block of a matchup; the winning strategy of each game, or None."""
+    winners: List[Optional[str]] = []
+    for k in range(2 * players):
+        seats = seating(players, a, b, k)
+        engine = GameEngine(human_name=None, ai_count=players, ai_strategies=seats,
+                            registry=registry, seed=derive_seed(seed, a, b, block, k))
+        turns = 0
+        while not engine.game_over and turns < max_turns:
+            engine.take_ai_turn(engine.current_player)  # type: ignore[arg-type]
+            turns += 1
+            if not engine.game_over:
+                engine.next_turn()
+        seat = next((i for i, p in enumerate(engine.players)
+                     if p.name == engine.winner), None)
+        winners.append(seats[seat] if seat is not None else None)
+    return winners
+
+
+class _Matchup:
+    """Block results of one matchup, consumed strictly in block order."""
+
+    def __init__(self, a: str, b: str, players: int, precision: float,
+                 min_games: int, max_games: int):
+        self.a, self.b = a, b
+        self.block_size = 2 * players
+        self.precision = precision
+        self.min_games = min_games
+        self.max_blocks = max(1, -(-max_games // self.block_size))
+        self.next_block = 0
+        self.pending: Dict[int, List[Optional[str]]] = {}
+        self.consumed = 0
+        self.games = self.a_wins = self.b_wins = self.unfinished = 0
+        self.done = False
+        self.converged = False
+
+    def wants_more(self) -> bool:
+        return not self.done and self.next_block < self.max_blocks
+
+    def add(self, block: int, winners: List[Optional[str]]) -> None:
+        self.pending[block] = winners
+        while not self.done and self.consumed in self.pending:
+            for w in self.pending.pop(self.consumed):
+                self.games += 1
+                if w == self.a:
+                    self.a_wins += 1
+                elif w == self.b:
+                    self.b_wins += 1
+                else:
+                    self.unfinished += 1
+            self.consumed += 1
+            low, high = wilson_interval(self.a_wins, self.a_wins + self.b_wins)
+            if self.games >= self.min_games and (high - low) / 2 <= self.precision:
+                self.done = self.converged = True
+            elif self.consumed >= self.max_blocks:
+                self.done = True
+
+    def result(self) -> MatchupResult:
+        decided = self.a_wins + self.b_wins
+        low, high = wilson_interval(self.a_wins, decided)
+        return MatchupResult(self.a, self.b, self.games, self.a_wins, self.b_wins,
+                             self.unfinished, self.a_wins / decided if decided else 0.5,
+                             low, high, self.converged)
+
+
+def run(strategies: List[str], players: int = 4, jobs: int = 1,
+        precision: float = 0.05, min_games: int = 100, max_games: int = 5000,
+        max_turns: int = 1000, seed: Optional[int] = None,
+        registry: CardRegistry = REGISTRY) -> List[MatchupResult]:
+    """Play every pair of strategies against each other until each matchup's
+    win-share interval is within `precision` (or `max_games` is reached)."""
+    if players < 2:
+        raise ValueError("a matchup needs at least 2 players")
+    for name in strategies:
+        get_strategy(name)
+    base = new_seed() if seed is None else seed
+    matchups = [_Matchup(a, b, players, precision, min_games, max_games)
+                for a, b in combinations(strategies, 2)]
+
+    def submit_args(m: _Matchup) -> tuple:
+        block = m.next_block
+        m.next_block += 1
+        return (players, m.a, m.b, base, block, max_turns, registry), block
+
+    if jobs <= 1:
+        for m in matchups:
+            while m.wants_more():
+                args, block = submit_args(m)
+                m.add(block, play_block(*args))
+        return [m.result() for m in matchups]
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        in_flight: Dict[Future, Tuple[_Matchup, int]] = {}
+
+        def refill() -> None:
+            # Keep the pool busy, sharing it between unfinished matchups
+            while len(in_flight) < 2 * jobs:
+                open_matchups = [m for m in matchups if m.wants_more()]
+                if not open_matchups:
+                    return
+                m = min(open_matchups, key=lambda m: m.next_block)
+                args, block = submit_args(m)
+                in_flight[pool.submit(play_block, *args)] = (m, block)
+
+        refill()
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for f in finished:
+                m, block = in_flight.pop(f)
+                if not m.done:
+                    m.add(block, f.result())
+            # Blocks of matchups that have stopped are no longer needed
+            for f, (m, _) in list(in_flight.items()):
+                if m.done and f.cancel():
+                    del in_flight[f]
+            refill()
+    return [m.result() for m in matchups]
+
+
+def format_report(results: List[MatchupResult]) -> str:
+    lines = [f"{'matchup':32} {'games':>6} {'share':>7} {'95% CI':>15}  note"]
+    for r in results:
+        note = "" if r.converged else "max games reached"
+        lines.append(f"{r.a + ' vs ' + r.b:32} {r.games:6d} {r.a_share:7.1%} "
+                     f"[{r.ci_low:5.1%}, {r.ci_high:5.1%}]  {note}".rstrip())
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--strategies", nargs="+", default=list(STRATEGIES),
+                        choices=list(STRATEGIES), help="strategies to pit against each other")
+    parser.add_argument("--players", type=int, default=4,
+                        help="seats per table")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (1 = run in-process)")
+    parser.add_argument("--precision", type=float, default=0.05,
+                        help="stop a matchup once its 95%% interval half-width is this small")
+    parser.add_argument("--min-games", type=int, default=100)
+    parser.add_argument("--max-games", type=int, default=5000)
+    parser.add_argument("--max-turns", type=int, default=1000,
+                        help="abandon a game after this many turns")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="base seed (default: random)")
+    parser.add_argument("--json", action="store_true",
+                        help="print the results as JSON")
+    parser.add_argument("--deck", default=None, metavar="PATH",
+                        help="play with the deck defined in this .json/.toml file")
+    args = parser.parse_args(argv)
+    registry = load_deck(args.deck) if args.deck else REGISTRY
+
+    seed = new_seed() if args.seed is None else args.seed
+    results = run(args.strategies, args.players, args.jobs, args.precision,
+                  args.min_games, args.max_games, args.max_turns, seed, registry)
+    if args.json:
+        print(json.dumps({"seed": seed, "matchups": [asdict(r) for r in results]},
+                         indent=2))
+    else:
+        print(f"Seed: {seed}")
+        print(format_report(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,23 @@
-import tkinter as tk
-from ui.app import ClueApp
-from logic.game_engine import GameEngine
+import argparse
+from models.cards import REGISTRY, load_deck
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Clue: Python Edition")
+    parser.add_argument("--deck", metavar="PATH",
+                        help="play with the deck defined in this .json/.toml file")
+    args = parser.parse_args()
+    registry = load_deck(args.deck) if args.deck else REGISTRY
+
+    # Tk is only needed once a window opens; the engine itself never imports it
+    import tkinter as tk
+    from logic.game_engine import GameEngine
+    from ui.app import ClueApp
+
     root = tk.Tk()
     root.title("Clue: Python Edition")
     # adjust AI count as you like
-    engine = GameEngine(human_name="You", ai_count=2)
+    engine = GameEngine(human_name="You", ai_count=2, registry=registry)
     app = ClueApp(root, engine)
     app.pack(fill="both", expand=True)
     root.minsize(1000, 650)
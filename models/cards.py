@@ -1,13 +1,26 @@
-from dataclasses import dataclass
-from typing import List, Literal
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Sequence, Tuple
 
-CardType = Literal["Suspect", "Weapon", "Room"]
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: JSON decks only
+    tomllib = None  # type: ignore[assignment]
+
+# A deck category name; the classic deck has "Suspect", "Weapon" and "Room"
+CardType = str
 
 
 @dataclass(frozen=True)
 class Card:
     name: str
     type: CardType
+    # Position in the owning CardRegistry; -1 for cards built outside a registry
+    id: int = field(default=-1, compare=False, repr=False)
+    key: str = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "key", f"{self.type}:{self.name}")
 
 
 SUSPECTS: List[str] = [
@@ -41,21 +54,102 @@ ROOMS: List[str] = [
 ]
 
 
-def all_cards() -> List[Card]:
-    return (
-        [Card(n, "Suspect") for n in SUSPECTS] +
-        [Card(n, "Weapon") for n in WEAPONS] +
-        [Card(n, "Room") for n in ROOMS]
-    )
+class CardRegistry:
+    """Canonical set of interned cards: the deck a game is played with.
+
+    Every card is created once, gets a stable integer id (its index in `cards`)
+    and can be looked up by key or id without allocating. The solution holds
+    one card of each category, in `categories` order.
+    """
+
+    def __init__(self, categories: Mapping[str, Sequence[str]], name: str = "custom"):
+        if not categories:
+            raise ValueError("a deck needs at least one category")
+        for cat, names in categories.items():
+            if not isinstance(cat, str) or not cat or ":" in cat:
+                raise ValueError(f"invalid category name {cat!r}")
+            if not names or not all(isinstance(n, str) and n for n in names):
+                raise ValueError(f"category {cat!r} needs one or more card names")
+            if len(set(names)) != len(names):
+                raise ValueError(f"category {cat!r} repeats a card name")
+        self.name = name
+        self.categories: Tuple[str, ...] = tuple(categories)
+        cards: List[Card] = []
+        by_category: Dict[str, Tuple[Card, ...]] = {}
+        for cat, names in categories.items():
+            start = len(cards)
+            cards.extend([Card(n, cat, start + k)  # type: ignore[arg-type]
+                          for k, n in enumerate(names)])
+            by_category[cat] = tuple(cards[start:])
+        self.cards: Tuple[Card, ...] = tuple(cards)
+        self.by_category = by_category
+        self._by_key: Dict[str, Card] = {c.key: c for c in self.cards}
+        self._ids: Dict[Card, int] = {c: c.id for c in self.cards}
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def card(self, key: str) -> Card:
+        return self._by_key[key]
+
+    def card_id(self, card: Card) -> int:
+        return self._ids[card]
+
+    def category_of_key(self, key: str) -> CardType:
+        return self._by_key[key].type
+
+    def category_cards(self, cat: CardType) -> Tuple[Card, ...]:
+        return self.by_category[cat]
+
+
+REGISTRY = CardRegistry({"Suspect": SUSPECTS, "Weapon": WEAPONS, "Room": ROOMS},
+                        name="classic")
 
 
-def category_cards(cat: CardType) -> List[Card]:
-    if cat == "Suspect":
-        return [Card(n, "Suspect") for n in SUSPECTS]
-    if cat == "Weapon":
-        return [Card(n, "Weapon") for n in WEAPONS]
-    return [Card(n, "Room") for n in ROOMS]
+def load_deck(path: str) -> CardRegistry:
+    """Read a deck definition from a .json or .toml file:
+
+        name = "Mansion"
+        [categories]
+        Suspect = ["Miss Scarlet", "Colonel Mustard"]
+        Weapon = ["Rope", "Wrench"]
+
+    Categories keep their order in the file.
+    """
+    if path.endswith(".toml"):
+        if tomllib is None:
+            raise ValueError("TOML decks need Python 3.11 or later")
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    categories = data.get("categories") if isinstance(data, dict) else None
+    if not isinstance(categories, dict):
+        raise ValueError(f"{path}: a deck needs a 'categories' table")
+    return CardRegistry(categories, name=str(data.get("name", path)))
+
+
+def all_cards() -> Tuple[Card, ...]:
+    return REGISTRY.cards
+
+
+def category_cards(cat: CardType) -> Tuple[Card, ...]:
+    return REGISTRY.by_category[cat]
 
 
 def card_key(card: Card) -> str:
-    return f"{card.type}:{card.name}"
+    return card.key
+
+
+def card_id(card: Card) -> int:
+    return card.id if card.id >= 0 else REGISTRY.card_id(card)
+
+
+def describe_guess(cards: Sequence[Card]) -> str:
+    """A suggestion or accusation as text: "Miss Scarlet with the Rope in
+    the Hall" for the classic categories, otherwise the names in order."""
+    if tuple(c.type for c in cards) == ("Suspect", "Weapon", "Room"):
+        s, w, r = cards
+        return f"{s.name} with the {w.name} in the {r.name}"
+    return ", ".join(c.name for c in cards)
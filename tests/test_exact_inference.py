@@ -0,0 +1,92 @@
+"""Exact deal counting, and its fallback when a position is too big to count."""
+import itertools
+import random
+import time
+
+from logic.exact_inference import card_marginals
+from logic.knowledge_base import KnowledgeBase
+from models.cards import CardRegistry
+
+
+def _deck(per_category: int) -> CardRegistry:
+    return CardRegistry({cat: [f"{cat} {i}" for i in range(per_category)]
+                         for cat in ("Suspect", "Weapon", "Room")})
+
+
+def _exact_kb(registry: CardRegistry, players: int = 4) -> KnowledgeBase:
+    names = [f"P{i}" for i in range(players)]
+    dealt = len(registry) - len(registry.categories)
+    sizes = {p: dealt // players + (i < dealt % players) for i, p in enumerate(names)}
+    hand = random.Random(1).sample(registry.cards, sizes[names[0]])
+    kb = KnowledgeBase(names[0], exact=True)
+    kb.initialize(names, list(registry.cards), hand, sizes)
+    return kb
+
+
+def _brute_force(allowed, capacities, clauses):
+    """card_marginals by listing every deal."""
+    n_slots = len(capacities)
+    deals = 0
+    seen = [[0] * n_slots for _ in allowed]
+    for deal in itertools.product(range(n_slots), repeat=len(allowed)):
+        if any(not allowed[c] >> s & 1 for c, s in enumerate(deal)):
+            continue
+        if any(deal.count(s) != cap for s, cap in enumerate(capacities)):
+            continue
+        if not all(any(cards >> c & 1 and deal[c] == slot for c in range(len(deal)))
+                   for slot, cards in clauses):
+            continue
+        deals += 1
+        for c, s in enumerate(deal):
+            seen[c][s] += 1
+    if not deals:
+        return None
+    return [[k / deals for k in row] for row in seen]
+
+
+def test_marginals_match_brute_force():
+    rng = random.Random(1)
+    for _ in range(300):
+        n_cards, n_slots = rng.randint(3, 6), rng.randint(2, 4)
+        # Built around one real deal, loosened with random extra slots
+        deal = [rng.randrange(n_slots) for _ in range(n_cards)]
+        capacities = tuple(deal.count(s) for s in range(n_slots))
+        allowed = tuple(1 << s | rng.getrandbits(n_slots) for s in deal)
+        clauses = tuple((rng.randrange(n_slots), rng.getrandbits(n_cards))
+                        for _ in range(rng.randint(0, 3)))
+        expected = _brute_force(allowed, capacities, clauses)
+        got = card_marginals(allowed, capacities, clauses)
+        if expected is None:
+            assert got is None
+            continue
+        assert got is not None
+        for c in range(n_cards):
+            for s in range(n_slots):
+                assert abs(got[c][s] - expected[c][s]) < 1e-9
+
+
+def test_small_deck_is_counted_exactly():
+    kb = _exact_kb(_deck(6))
+    kb.update_probabilities()
+    assert kb.probabilities_exact
+
+
+def test_large_deck_falls_back_quickly():
+    for per_category in (30, 200):
+        kb = _exact_kb(_deck(per_category))
+        start = time.perf_counter()
+        kb.update_probabilities()
+        assert not kb.probabilities_exact
+        assert time.perf_counter() - start < 5.0
+        # Rereading an equally open position skips counting altogether
+        start = time.perf_counter()
+        kb.update_probabilities()
+        assert time.perf_counter() - start < 0.5
+
+
+def test_one_big_group_is_refused_before_counting():
+    # 1000 interchangeable cards that may sit in any of four slots of 300
+    allowed = (0b1111,) * 1000
+    start = time.perf_counter()
+    assert card_marginals(allowed, (300, 300, 300, 300)) is None
+    assert time.perf_counter() - start < 1.0
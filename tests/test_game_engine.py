@@ -0,0 +1,53 @@
+"""A human who holds a suggested card must show one of them."""
+import asyncio
+
+import pytest
+
+from logic.game_engine import GameEngine
+
+
+def _suggestion_the_human_must_answer(engine: GameEngine):
+    """The AI seated before the human, and a guess holding some of the human's cards."""
+    human, ai = engine.players[0], engine.players[-1]
+    engine.turn_index = len(engine.players) - 1
+    guess = []
+    for cat in engine.registry.categories:
+        own = [c for c in engine.registry.category_cards(cat) if c in human.hand]
+        guess.append(own[0] if own else engine.registry.category_cards(cat)[0])
+    return ai, guess
+
+
+class _Answers:
+    def __init__(self, answer):
+        self.answer = answer
+
+    def choose_card_to_show(self, cards, suggester):
+        return self.answer
+
+
+@pytest.mark.parametrize("answer", [None, "unoffered"])
+def test_a_missing_or_wrong_card_is_refused(answer):
+    engine = GameEngine(human_name="You", ai_count=3, seed=5)
+    ai, guess = _suggestion_the_human_must_answer(engine)
+    if answer == "unoffered":
+        answer = next(c for c in engine.registry.cards if c not in guess)
+    engine.set_responder(_Answers(answer))
+    before = [p.kb.fingerprint for p in engine.players[1:]]
+    with pytest.raises(ValueError):
+        engine.handle_suggestion(ai, *guess)
+    # Nobody learned a pass, and the engine is not left waiting
+    assert [p.kb.fingerprint for p in engine.players[1:]] == before
+    assert engine.pending_request is None
+    assert not engine.suggested_this_turn
+
+
+def test_async_answer_is_checked_too():
+    engine = GameEngine(human_name="You", ai_count=3, seed=5)
+    ai, guess = _suggestion_the_human_must_answer(engine)
+
+    async def ask(request):
+        return None
+
+    with pytest.raises(ValueError):
+        asyncio.run(engine.handle_suggestion_async(ai, *guess, ask=ask))
+    assert engine.pending_request is None
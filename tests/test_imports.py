@@ -0,0 +1,27 @@
+"""The engine, models and main entry point import without any GUI stack."""
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Runs in a fresh interpreter; tkinter is blocked, so importing it would fail
+CHECK = """
+import importlib, pkgutil, sys
+sys.modules["tkinter"] = None
+import main
+for pkg in ("logic", "models"):
+    for info in pkgutil.iter_modules([pkg]):
+        importlib.import_module(f"{pkg}.{info.name}")
+gui = sorted(m for m in sys.modules
+             if m.split(".")[0] in ("tkinter", "_tkinter", "ui")
+             and sys.modules[m] is not None)
+print(",".join(gui))
+"""
+
+
+def test_logic_models_and_main_import_without_gui():
+    result = subprocess.run([sys.executable, "-c", CHECK], cwd=ROOT,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
@@ -0,0 +1,60 @@
+"""Deductions of the knowledge base: clauses, hand sizes and saved state."""
+from typing import Dict, List, Optional
+
+from logic.knowledge_base import KnowledgeBase
+from models.cards import REGISTRY, Card
+
+PLAYERS = ["Me", "P1", "P2"]
+CARDS = list(REGISTRY.cards)
+MY_HAND = CARDS[0:12:2]  # six cards spread over suspects and weapons
+SUSPECT, WEAPON, ROOM = (REGISTRY.category_cards(cat)[-1] for cat in REGISTRY.categories)
+
+
+def _kb(hand_sizes: Optional[Dict[str, int]] = None) -> KnowledgeBase:
+    kb = KnowledgeBase("Me")
+    kb.initialize(PLAYERS, CARDS, MY_HAND, hand_sizes)
+    return kb
+
+
+def _others(kb: KnowledgeBase, player: str) -> List[Card]:
+    """Cards whose holder is still open for player."""
+    return [c for c in CARDS if kb.is_known_to_player(player, c) is None]
+
+
+def test_two_passes_force_the_third_card_of_a_clause():
+    kb = _kb()
+    kb.note_has_one_of("P1", [SUSPECT, WEAPON, ROOM])
+    assert kb.is_known_to_player("P1", ROOM) is None
+    kb.note_cannot_have_any("P1", [SUSPECT])
+    assert kb.is_known_to_player("P1", ROOM) is None
+    kb.note_cannot_have_any("P1", [WEAPON])
+    assert kb.is_known_to_player("P1", ROOM) is True
+    assert kb.holder_of(ROOM) == "P1"
+
+
+def test_a_full_hand_excludes_every_other_card():
+    kb = _kb({"Me": 6, "P1": 6, "P2": 6})
+    held = _others(kb, "P1")[:6]
+    for card in held:
+        kb.note_has_card("P1", card)
+    for card in CARDS:
+        assert kb.is_known_to_player("P1", card) is (card in held)
+
+
+def test_as_many_open_cards_as_free_slots_are_all_held():
+    kb = _kb({"Me": 6, "P1": 6, "P2": 6})
+    open_cards = _others(kb, "P1")
+    kept = open_cards[-6:]
+    kb.note_cannot_have_any("P1", open_cards[:-6])
+    for card in kept:
+        assert kb.is_known_to_player("P1", card) is True
+
+
+def test_restore_rewatches_clauses():
+    kb = _kb()
+    kb.note_has_one_of("P1", [SUSPECT, WEAPON, ROOM])
+    restored = KnowledgeBase("Me")
+    restored.restore(kb.state(), CARDS)
+    assert restored.fingerprint == kb.fingerprint
+    restored.note_cannot_have_any("P1", [SUSPECT, WEAPON])
+    assert restored.is_known_to_player("P1", ROOM) is True
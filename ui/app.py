@@ -1,21 +1,37 @@
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
-from typing import Optional
-from models.cards import Card, category_cards
+from typing import List, Optional
+from models.cards import Card
+from models.player import AIPlayer
+from logic.events import GameEvent, Handler
 from logic.game_engine import GameEngine
 from ui.hand_view import HandView
 from ui.clue_sheet import ClueSheet
 from ui.log_view import LogView
 from ui.controls import Controls
+from ui.show_card_dialog import ShowCardDialog
 
 
 class ClueApp(tk.Frame):
+    # How often the main loop checks for messages from the AI worker (ms)
+    POLL_MS = 20
+
     def __init__(self, master: tk.Tk, engine: GameEngine):
         super().__init__(master)
         self.engine = engine
-        self.engine.set_ui(self)
+        # The app answers the engine's questions to the human
+        self.engine.set_responder(self)
+        # AI turns run on a worker thread; it reports back through this queue
+        # and the main loop picks messages up in _poll_ai_worker
+        self._ai_thread: Optional[threading.Thread] = None
+        self._ai_events: "queue.Queue[tuple]" = queue.Queue()
+        self._human_name = next(
+            (p.name for p in engine.players if p.is_human), None)
         self._build_layout()
         self._refresh_all()
+        self._subscribe()
         self._maybe_run_ai_turn()
 
     def _build_layout(self):
@@ -27,28 +43,33 @@ class ClueApp(tk.Frame):
         self.hand_view.pack(fill="x", pady=(0, 8))
 
         self.controls = Controls(left, on_suggest=self._on_suggest,
-                                 on_accuse=self._on_accuse, on_end_turn=self._on_end_turn)
+                                 on_accuse=self._on_accuse, on_end_turn=self._on_end_turn,
+                                 registry=self.engine.registry)
         self.controls.pack(fill="x")
 
         # Right: clue sheet + log
         right = ttk.Frame(self)
         right.pack(side="left", fill="both", expand=True, padx=8, pady=8)
 
-        self.sheet = ClueSheet(right, players=self.engine.players)
+        self.sheet = ClueSheet(right, players=self.engine.players,
+                               registry=self.engine.registry)
         self.sheet.pack(fill="both", expand=True, pady=(0, 8))
 
         self.log_view = LogView(right)
         self.log_view.pack(fill="both", expand=True)
 
     def _refresh_all(self):
-        human = next(p for p in self.engine.players if p.is_human)
-        self.hand_view.update_hand(human.hand)
-        self.controls.update_options()
-        self._refresh_log()
-        self._update_turn_state()
+        """Sync every widget with the engine; after that, events keep them current."""
+        with self.engine.lock:
+            human = next(p for p in self.engine.players if p.is_human)
+            self.hand_view.update_hand(human.hand)
+            self.controls.update_options()
+            self._refresh_log()
+            self._update_turn_state()
 
     def _refresh_log(self):
-        self.log_view.set_lines([e.text for e in self.engine.logs])
+        self.log_view.append_entries(
+            self.engine.logs.entries_since(self.log_view.last_seq))
 
     def _update_turn_state(self):
         cur = self.engine.current_player
@@ -60,11 +81,58 @@ class ClueApp(tk.Frame):
         else:
             self.controls.set_suggest_enabled(False)
 
-    def _on_suggest(self, suspect: Card, weapon: Card, room: Card):
+    def _subscribe(self):
+        handlers = {
+            "log_appended": self._on_log_appended,
+            "turn_advanced": self._on_turn_advanced,
+            "suggestion_made": self._on_suggestion_made,
+            "game_over": self._on_game_over,
+        }
+        for kind, handler in handlers.items():
+            self.engine.events.subscribe(kind, self._on_main_thread(handler))
+
+    def _on_main_thread(self, handler: Handler) -> Handler:
+        """Wrap an event handler so it always runs on the Tk thread.
+
+        Events published by the AI worker are queued for _poll_ai_worker;
+        handlers only use the event data, never the (locked) engine.
+        """
+        def dispatch(event: GameEvent):
+            if threading.current_thread() is threading.main_thread():
+                handler(event)
+            else:
+                self._ai_events.put(("event", (handler, event)))
+        return dispatch
+
+    def _on_log_appended(self, event: GameEvent):
+        self.log_view.append_entries([event.data["entry"]])
+
+    def _on_turn_advanced(self, event: GameEvent):
+        is_human = event.data["player"] == self._human_name
+        self.controls.set_turn_owner(event.data["player"], is_human=is_human)
+        self.controls.set_suggest_enabled(is_human)
+
+    def _on_suggestion_made(self, event: GameEvent):
+        if event.data["suggester"] == self._human_name:
+            # ensure Suggest stays disabled after use
+            self.controls.set_suggest_enabled(False)
+
+    def _on_game_over(self, event: GameEvent):
+        self.controls.set_game_over(event.data["winner"])
+
+    @property
+    def ai_busy(self) -> bool:
+        """True while an AI turn is running on the worker thread."""
+        return self._ai_thread is not None
+
+    def _on_suggest(self, *cards: Card):
+        if self.ai_busy:
+            return
         cur = self.engine.current_player
         if not cur.is_human:
             return
-        result = self.engine.handle_suggestion(cur, suspect, weapon, room)
+        with self.engine.lock:
+            result = self.engine.handle_suggestion(cur, *cards)
         if result["shower"]:
             if result["card"] is not None:
                 messagebox.showinfo(
@@ -75,52 +143,97 @@ class ClueApp(tk.Frame):
         else:
             messagebox.showinfo(
                 "No refute", "No one could refute your suggestion.")
-        self._refresh_all()
-        # ensure Suggest stays disabled after use
-        self.controls.set_suggest_enabled(False)
 
-    def _on_accuse(self, suspect: Card, weapon: Card, room: Card):
+    def _on_accuse(self, *cards: Card):
+        if self.ai_busy:
+            return
         cur = self.engine.current_player
         if not cur.is_human:
             return
-        if self.engine.check_accusation(cur, suspect, weapon, room):
+        with self.engine.lock:
+            correct = self.engine.check_accusation(cur, *cards)
+        if correct:
             messagebox.showinfo(
                 "You win!", "Your accusation is correct. Game over.")
-            self._refresh_all()
         else:
             messagebox.showwarning(
                 "Incorrect", "Your accusation is incorrect. You are out.")
             # immediately pass turn to next active player and continue
-            self.engine.next_turn()
-            self._refresh_all()
+            with self.engine.lock:
+                self.engine.next_turn()
             self._maybe_run_ai_turn()
 
     def _on_end_turn(self):
-        self.engine.next_turn()
-        self._refresh_all()
+        if self.ai_busy:
+            return
+        with self.engine.lock:
+            self.engine.next_turn()
         self._maybe_run_ai_turn()
 
+    def choose_card_to_show(self, cards: List[Card], suggester: str) -> Card:
+        """Ask the human which of their cards to show; called by the engine.
+
+        Safe to call from the AI worker: the dialog is opened on the main
+        thread and the worker blocks until the human answers.
+        """
+        if threading.current_thread() is threading.main_thread():
+            return self._ask_card_to_show(cards)
+        reply: "queue.Queue[Card]" = queue.Queue(maxsize=1)
+        self._ai_events.put(("show_card", (cards, reply)))
+        return reply.get()
+
+    def _ask_card_to_show(self, cards: List[Card]) -> Card:
+        chosen_name = ShowCardDialog(self.winfo_toplevel(), cards).result
+        return next(c for c in cards if c.name == chosen_name)
+
     def _maybe_run_ai_turn(self):
-        if self.engine.game_over:
+        if self.engine.game_over or self.ai_busy:
             return
         cur = self.engine.current_player
         if cur.is_human:
             return
-        self.after(500, self._run_ai_turn)
-
-    def _run_ai_turn(self):
-        if self.engine.game_over:
-            return
-        cur = self.engine.current_player
-        if not cur.is_human:
-            from models.player import AIPlayer
-            ai: AIPlayer = cur  # type: ignore
-            # Let the engine handle the whole turn (accuse → suggest)
-            self.engine.take_ai_turn(ai)
-            self._refresh_all()
-
-            # If the game isn't over, pass turn and continue
-            if not self.engine.game_over:
-                self.engine.next_turn()
+        self._ai_thread = threading.Thread(
+            target=self._run_ai_turn, args=(cur,), name="ai-turn", daemon=True)
+        self._ai_thread.start()
+        self.after(self.POLL_MS, self._poll_ai_worker)
+
+    def _run_ai_turn(self, ai: AIPlayer):
+        """Worker thread: play one whole AI turn (accuse → suggest) and pass it on.
+
+        Never touches Tk; everything for the UI goes through _ai_events.
+        """
+        try:
+            with self.engine.lock:
+                self.engine.take_ai_turn(ai)
+                # If the game isn't over, pass turn
+                if not self.engine.game_over:
+                    self.engine.next_turn()
+        except Exception as exc:
+            self._ai_events.put(("error", exc))
+        else:
+            self._ai_events.put(("done", None))
+
+    def _poll_ai_worker(self):
+        """Main thread: handle what the AI worker sent, then keep polling while it runs."""
+        while True:
+            try:
+                kind, payload = self._ai_events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "event":
+                handler, event = payload
+                handler(event)
+            elif kind == "show_card":
+                cards, reply = payload
+                reply.put(self._ask_card_to_show(cards))
+            elif kind == "error":
+                self._ai_thread = None
                 self._refresh_all()
+                raise payload
+            elif kind == "done":
+                self._ai_thread = None
+                # Chain straight into the next AI turn, if any
                 self._maybe_run_ai_turn()
+                return
+        if self.ai_busy:
+            self.after(self.POLL_MS, self._poll_ai_worker)
@@ -1,58 +1,119 @@
 import tkinter as tk
+import tkinter.font as tkfont
 from tkinter import ttk
-from typing import Dict
-from models.cards import SUSPECTS, WEAPONS, ROOMS
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+from models.cards import REGISTRY, Card, CardRegistry
 
 STATE_CYCLE = ["", "✓", "✗", "?"]
 
+# Section headings for the classic categories; others use the category name
+SECTION_TITLES = {"Suspect": "Suspects", "Weapon": "Weapons", "Room": "Rooms"}
+
+# (card key, player name)
+CellKey = Tuple[str, str]
+
 
 class ClueSheet(ttk.LabelFrame):
-    def __init__(self, master, players, *args, **kwargs):
+    """Notes grid of cards x players drawn on one Canvas.
+
+    Cells are canvas items rather than widgets, clicks are routed by
+    coordinate, and marks live in `marks` so any number of them can be
+    changed with one set_marks() call.
+    """
+
+    ROW_HEIGHT = 22
+    MIN_COL_WIDTH = 36
+
+    def __init__(self, master, players, *args, registry: CardRegistry = REGISTRY, **kwargs):
         super().__init__(master, text="Clue Sheet", *args, **kwargs)
+        self.players: List[str] = [p.name for p in players]
+        self.marks: Dict[CellKey, str] = {}
+
+        # One entry per drawn row below the header: a section title or a card
+        self._rows: List[Union[str, Card]] = []
+        for cat in registry.categories:
+            self._rows.append(SECTION_TITLES.get(cat, cat))
+            self._rows.extend(registry.category_cards(cat))
+        # Canvas text item for each cell's mark
+        self._cell_text: Dict[CellKey, int] = {}
+
+        self.canvas = tk.Canvas(self, highlightthickness=0, background="white")
+        scroll = ttk.Scrollbar(self, orient="vertical",
+                               command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=scroll.set)
+        scroll.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.canvas.bind("<Button-1>", self._on_click)
+        self._draw()
+
+    def _draw(self):
+        c = self.canvas
+        c.delete("all")
+        self._cell_text.clear()
+        font = tkfont.nametofont("TkDefaultFont")
+        bold = font.copy()
+        bold.configure(weight="bold")
+        self._bold = bold  # keep a reference; Tk drops unreferenced fonts
 
-        container = ttk.Frame(self)
-        container.pack(fill="both", expand=True)
-
-        self.cells: Dict[str, tk.Label] = {}
-
-        ttk.Label(container, text="", font=("Arial", 12, "bold")).grid(
-            row=0, column=0, sticky="nsew"
-        )
-        for idx, p in enumerate(players, start=1):
-            ttk.Label(container, text=p.name, font=("Arial", 10, "bold")).grid(
-                row=0, column=idx, padx=4, pady=4, sticky="nsew"
-            )
-            container.grid_columnconfigure(idx, weight=1, uniform="playercols")
-
-        row = 1
-        row = self._add_section(container, "Suspects", SUSPECTS, row)
-        row = self._add_section(container, "Weapons", WEAPONS, row)
-        self._add_section(container, "Rooms", ROOMS, row)
-
-    def _add_section(self, parent, title: str, items, start_row: int) -> int:
-        """Add a section title and its rows; return next available row index."""
-        ttk.Label(parent, text=title, font=("TkDefaultFont", 10, "bold")).grid(
-            row=start_row, column=0, sticky="w"
-        )
-        start_row += 1
-        for name in items:
-            self._add_row(parent, name, start_row)
-            start_row += 1
-        return start_row
-
-    def _add_row(self, parent, name: str, row: int):
-        ttk.Label(parent, text=name).grid(
-            row=row, column=0, sticky="w", padx=(0, 8))
-        for col in range(1, 4):
-            key = f"{name}:{col}"
-            lbl = tk.Label(parent, text="", relief="ridge",
-                           width=3, bg="white")
-            lbl.grid(row=row, column=col, padx=2, pady=1, sticky="nsew")
-            lbl.bind("<Button-1>", lambda e, k=key: self._cycle(k))
-            self.cells[key] = lbl
-
-    def _cycle(self, key: str):
-        lbl = self.cells[key]
-        cur = lbl.cget("text")
+        cards = [row for row in self._rows if isinstance(row, Card)]
+        self._name_width = max(font.measure(card.name) for card in cards) + 16
+        self._col_width = max([self.MIN_COL_WIDTH] +
+                              [bold.measure(p) + 12 for p in self.players])
+        h, x0, w = self.ROW_HEIGHT, self._name_width, self._col_width
+
+        for col, name in enumerate(self.players):
+            c.create_text(x0 + col * w + w / 2, h / 2, text=name, font=bold)
+        for r, row in enumerate(self._rows, start=1):
+            y = r * h
+            if not isinstance(row, Card):
+                c.create_text(4, y + h / 2, text=row, font=bold, anchor="w")
+                continue
+            c.create_text(4, y + h / 2, text=row.name, font=font, anchor="w")
+            for col, player in enumerate(self.players):
+                x = x0 + col * w
+                c.create_rectangle(x + 1, y + 1, x + w - 1, y + h - 1,
+                                   outline="#b0b0b0", fill="white")
+                key = (row.key, player)
+                self._cell_text[key] = c.create_text(
+                    x + w / 2, y + h / 2, text=self.marks.get(key, ""), font=font)
+
+        width = x0 + len(self.players) * w
+        height = (len(self._rows) + 1) * h
+        c.configure(scrollregion=(0, 0, width, height), width=width)
+
+    def cell_at(self, x: float, y: float) -> Optional[CellKey]:
+        """The cell under canvas coordinates (x, y), if any."""
+        r = int(y // self.ROW_HEIGHT) - 1
+        col = int((x - self._name_width) // self._col_width)
+        if x < self._name_width or not 0 <= r < len(self._rows) or \
+                not 0 <= col < len(self.players):
+            return None
+        row = self._rows[r]
+        if not isinstance(row, Card):
+            return None
+        return row.key, self.players[col]
+
+    def _on_click(self, event):
+        key = self.cell_at(self.canvas.canvasx(event.x),
+                           self.canvas.canvasy(event.y))
+        if key is not None:
+            self._cycle(key)
+
+    def _cycle(self, key: CellKey):
+        cur = self.marks.get(key, "")
         nxt = STATE_CYCLE[(STATE_CYCLE.index(cur) + 1) % len(STATE_CYCLE)]
-        lbl.config(text=nxt)
+        self.set_marks({key: nxt})
+
+    def set_marks(self, marks: Mapping[CellKey, str]):
+        """Update many cells at once; only cells whose mark changed are touched."""
+        for key, mark in marks.items():
+            if self.marks.get(key, "") == mark or key not in self._cell_text:
+                continue
+            if mark:
+                self.marks[key] = mark
+            else:
+                self.marks.pop(key, None)
+            self.canvas.itemconfigure(self._cell_text[key], text=mark)
+
+    def clear(self):
+        self.set_marks({key: "" for key in self.marks})
@@ -1,18 +1,21 @@
 import tkinter as tk
 from tkinter import ttk
-from typing import Callable, Optional
-from models.cards import Card, category_cards
+from typing import Callable, Dict, Optional, Tuple
+from models.cards import REGISTRY, Card, CardRegistry
 
 
 class Controls(ttk.LabelFrame):
     def __init__(
         self,
         master,
-        on_suggest: Callable[[Card, Card, Card], None],
-        on_accuse: Callable[[Card, Card, Card], None],
+        on_suggest: Callable[..., None],
+        on_accuse: Callable[..., None],
         on_end_turn: Callable[[], None],
+        registry: CardRegistry = REGISTRY,
     ):
+        """on_suggest and on_accuse get one card per registry category."""
         super().__init__(master, text="Turn controls")
+        self.registry = registry
         self.on_suggest = on_suggest
         self.on_accuse = on_accuse
         self.on_end_turn = on_end_turn
@@ -23,17 +26,14 @@ class Controls(ttk.LabelFrame):
         form = ttk.Frame(self)
         form.pack(fill="x", padx=8, pady=4)
 
-        # Dropdowns
-        self.suspect_var = tk.StringVar()
-        self.weapon_var = tk.StringVar()
-        self.room_var = tk.StringVar()
-
-        self.suspect_cb = self._make_combo(form, "Suspect", self.suspect_var, [
-                                           c.name for c in category_cards("Suspect")])
-        self.weapon_cb = self._make_combo(form, "Weapon", self.weapon_var, [
-                                          c.name for c in category_cards("Weapon")])
-        self.room_cb = self._make_combo(form, "Room", self.room_var, [
-                                        c.name for c in category_cards("Room")])
+        # One dropdown per deck category
+        self.vars: Dict[str, tk.StringVar] = {}
+        self.combos: Dict[str, ttk.Combobox] = {}
+        for cat in registry.categories:
+            self.vars[cat] = tk.StringVar()
+            self.combos[cat] = self._make_combo(
+                form, cat, self.vars[cat],
+                [c.name for c in registry.category_cards(cat)])
 
         # Buttons
         btns = ttk.Frame(self)
@@ -51,7 +51,7 @@ class Controls(ttk.LabelFrame):
     def _make_combo(self, parent, label, var, values):
         row = ttk.Frame(parent)
         row.pack(fill="x", pady=2)
-        ttk.Label(row, text=label, width=8).pack(side="left")
+        ttk.Label(row, text=label, width=max(8, len(label))).pack(side="left")
         cb = ttk.Combobox(row, textvariable=var,
                           values=values, state="readonly")
         cb.pack(side="left", fill="x", expand=True)
@@ -67,26 +67,23 @@ class Controls(ttk.LabelFrame):
         self.turn_label.config(
             text=f"Current: {name} {'(You)' if is_human else ''}")
         state = "normal" if is_human else "disabled"
-        for w in (self.suspect_cb, self.weapon_cb, self.room_cb, self.suggest_btn, self.accuse_btn, self.end_btn):
+        for w in (*self.combos.values(), self.suggest_btn, self.accuse_btn, self.end_btn):
             w.configure(state=state)
 
+    def set_game_over(self, winner: str):
+        self.turn_label.config(text=f"Game over: {winner} wins")
+        for w in (*self.combos.values(), self.suggest_btn, self.accuse_btn, self.end_btn):
+            w.configure(state="disabled")
+
     def set_suggest_enabled(self, enabled: bool):
         self.suggest_btn.configure(state="normal" if enabled else "disabled")
 
-    def _get_selected(self):
-        def pick(cat):
-            name = {
-                "Suspect": self.suspect_var.get(),
-                "Weapon": self.weapon_var.get(),
-                "Room": self.room_var.get(),
-            }[cat]
-            return next(c for c in category_cards(cat) if c.name == name)
-        return pick("Suspect"), pick("Weapon"), pick("Room")
+    def _get_selected(self) -> Tuple[Card, ...]:
+        return tuple(self.registry.card(f"{cat}:{var.get()}")
+                     for cat, var in self.vars.items())
 
     def _suggest(self):
-        s, w, r = self._get_selected()
-        self.on_suggest(s, w, r)
+        self.on_suggest(*self._get_selected())
 
     def _accuse(self):
-        s, w, r = self._get_selected()
-        self.on_accuse(s, w, r)
+        self.on_accuse(*self._get_selected())
@@ -1,18 +1,45 @@
 import tkinter as tk
 from tkinter import ttk
-from typing import List
+from typing import List, Sequence
+
+from logic.game_log import LogEntry
 
 
 class LogView(ttk.LabelFrame):
+    # Oldest lines are dropped beyond this many
+    MAX_LINES = 300
+
     def __init__(self, master):
         super().__init__(master, text="Game log")
         self.text = tk.Text(self, height=12, state="disabled", wrap="word")
         self.text.pack(fill="both", expand=True, padx=8, pady=8)
+        # Sequence number of the newest entry shown, and how many lines are shown
+        self.last_seq = 0
+        self._line_count = 0
 
     def set_lines(self, lines: List[str]):
         self.text.configure(state="normal")
         self.text.delete("1.0", "end")
-        for line in lines[-300:]:
+        lines = lines[-self.MAX_LINES:]
+        for line in lines:
             self.text.insert("end", line + "\n")
         self.text.configure(state="disabled")
         self.text.see("end")
+        self._line_count = len(lines)
+
+    def append_entries(self, entries: Sequence[LogEntry]):
+        """Show entries newer than the last one rendered; older ones are skipped."""
+        new = [e for e in entries[-self.MAX_LINES:] if e.seq > self.last_seq]
+        if not new:
+            return
+        self.last_seq = new[-1].seq
+
+        self.text.configure(state="normal")
+        self.text.insert("end", "".join(e.text + "\n" for e in new))
+        self._line_count += len(new)
+        overflow = self._line_count - self.MAX_LINES
+        if overflow > 0:
+            self.text.delete("1.0", f"{overflow + 1}.0")
+            self._line_count = self.MAX_LINES
+        self.text.configure(state="disabled")
+        self.text.see("end")
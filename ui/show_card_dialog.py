@@ -21,14 +21,10 @@ class ShowCardDialog(tk.Toplevel):
                 variable=self.var
             ).pack(anchor="w", padx=12, pady=2)
 
-        btns = ttk.Frame(self)
-        btns.pack(pady=12)
-        ttk.Button(btns, text="OK", command=self._on_ok).pack(
-            side="left", padx=6)
-        ttk.Button(btns, text="Cancel", command=self._on_cancel).pack(
-            side="left", padx=6)
+        ttk.Button(self, text="OK", command=self._on_ok).pack(pady=12)
 
-        self.protocol("WM_DELETE_WINDOW", self._on_cancel)
+        # Holding a suggested card means showing one, so there is no cancel
+        self.protocol("WM_DELETE_WINDOW", lambda: None)
         self.transient(master)
         self.grab_set()
         self.wait_window(self)
@@ -36,7 +32,3 @@ class ShowCardDialog(tk.Toplevel):
     def _on_ok(self):
         self.result = self.var.get()
         self.destroy()
-
-    def _on_cancel(self):
-        self.result = None
-        self.destroy()